@@ -1,37 +1,498 @@
 # app.py
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import os
+import asyncio
+import functools
+import importlib.util
+import json
 import smtplib
-import time
 import re
 import urllib.parse
-import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import WebDriverException, NoSuchElementException, TimeoutException
+import queue
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from dedupe import StreamDeduper
+from details import parse_details
+from job_store import (export_jobs_parquet, is_known, job_fingerprint, job_months, load_details, load_page_history,
+                       load_seen_keys, load_source_health, record_page_yield, record_seen, save_details,
+                       save_source_health, upsert_jobs)
+from links import canonical_link
+from metrics import RunMetrics
+from fixtures import FixtureStore
+from http_cache import CACHE_DIR, ResponseCache, content_hash
+from sources import SOURCES, source_queries, source_urls, parse_key, parse_hub_page
+from students import JobIndex, load_profiles
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 
 # -------------------------
 # CONFIG / SETUP
+# pandas/numpy, requests, bs4 and selenium are imported inside the functions
+# that use them, so importing app (e.g. for looks_relevant) or a run that
+# never opens a browser doesn't pay for them. benchmarks/bench_startup.py
+# tracks the cost.
 # -------------------------
-# Selenium/Chrome options suitable for GitHub Actions
-chrome_options = Options()
-chrome_options.add_argument("headless")
-chrome_options.add_argument("no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--window-size=1920,1080")
 # optional: avoid images to speed up
 chrome_prefs = {"profile.managed_default_content_settings.images": 2}
-chrome_options.add_experimental_option("prefs", chrome_prefs)
 
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-time.sleep(1)
+def build_chrome_options():
+    """Selenium/Chrome options suitable for GitHub Actions."""
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    chrome_options.add_argument("headless")
+    chrome_options.add_argument("no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_experimental_option("prefs", chrome_prefs)
+    if blocked_url_patterns():
+        # performance log = per-request network events, read by record_network()
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return chrome_options
+
+# Stage timings and counts of the current run (metrics.py); stream_jobs()
+# starts a fresh one and __main__ writes it out as the run report.
+run_metrics = RunMetrics()
+
+# Number of headless Chrome instances a run may keep open at once.
+# Each instance costs ~150-300 MB on the Actions runner, so keep this small.
+SCRAPER_POOL_SIZE = max(1, int(os.getenv("SCRAPER_POOL_SIZE", "3")))
+
+# -------------------------
+# RESOURCE BLOCKING
+# Browsers block the resource types in SCRAPER_BLOCK_RESOURCES and the
+# ad/analytics domains in BLOCKED_DOMAINS through the DevTools protocol
+# (Network.setBlockedURLs), so driver.get only downloads the document and
+# the scripts that render listings. Blocked requests and downloaded bytes
+# are read back from Chrome's performance log after every page.
+# -------------------------
+RESOURCE_PATTERNS = {  # resource type -> URL patterns blocked for it
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "stylesheet": ["*.css*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"],
+}
+BLOCKED_TYPES = [t.strip() for t in os.getenv("SCRAPER_BLOCK_RESOURCES", "image,font,stylesheet,media").split(",")
+                 if t.strip()]
+BLOCKED_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "adservice.google.com", "facebook.net", "hotjar.com", "clarity.ms", "scorecardresearch.com",
+    "nr-data.net", "bat.bing.com", "criteo.com", "taboola.com", "ads.linkedin.com", "px.ads.linkedin.com",
+] + [d.strip() for d in os.getenv("SCRAPER_BLOCK_DOMAINS", "").split(",") if d.strip()]
+NETWORK_STATS = {}  # host -> pages / requests / bytes loaded and blocked requests by type
+
+def blocked_url_patterns():
+    patterns = [p for t in BLOCKED_TYPES for p in RESOURCE_PATTERNS.get(t, [])]
+    return patterns + [f"*{domain}/*" for domain in BLOCKED_DOMAINS]
+
+def enable_resource_blocking(d):
+    from selenium.common.exceptions import WebDriverException
+    patterns = blocked_url_patterns()
+    if not patterns:
+        return
+    try:
+        d.execute_cdp_cmd("Network.enable", {})
+        d.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except WebDriverException as e:
+        print(f"⚠️ Resource blocking unavailable: {e}")
+
+def record_network(d, url):
+    """Fold the network events logged since the last call into NETWORK_STATS[host]."""
+    try:
+        entries = d.get_log("performance")
+    except Exception:
+        return
+    loaded = loaded_bytes = 0
+    blocked = Counter()
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.loadingFinished":
+            loaded += 1
+            loaded_bytes += params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked[params.get("type", "Other")] += 1
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    with _stats_lock:
+        st = NETWORK_STATS.setdefault(host, {"pages": 0, "requests": 0, "bytes": 0, "blocked": Counter()})
+        st["pages"] += 1
+        st["requests"] += loaded
+        st["bytes"] += loaded_bytes
+        st["blocked"].update(blocked)
+
+def print_network_stats():
+    for host, st in sorted(NETWORK_STATS.items()):
+        by_type = ", ".join(f"{t} {n}" for t, n in st["blocked"].most_common())
+        print(f"   🚫 {host}: {sum(st['blocked'].values())} request(s) blocked ({by_type or 'none'}), "
+              f"{st['requests']} loaded, {st['bytes'] / 1e6:.1f} MB over {st['pages']} page(s)")
+
+# -------------------------
+# DRIVER POOL
+# Browsers are only started when a task first needs one. The chromedriver
+# path resolved by ChromeDriverManager (a network version check) is kept in
+# DRIVER_PATH_FILE and reused by later runs for DRIVER_PATH_MAX_AGE.
+# -------------------------
+DRIVER_PATH_FILE = os.path.join(CACHE_DIR, "chromedriver.json")
+DRIVER_PATH_MAX_AGE = 7 * 24 * 3600
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def chromedriver_path(refresh=False):
+    """
+    chromedriver binary to launch: SCRAPER_CHROMEDRIVER if set, else the
+    cached resolution if the binary still exists, else a fresh
+    ChromeDriverManager().install() (also used when `refresh` is set).
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and not refresh:
+            return _driver_path
+        path = None if refresh else os.getenv("SCRAPER_CHROMEDRIVER")
+        if not path and not refresh:
+            try:
+                with open(DRIVER_PATH_FILE) as f:
+                    cached = json.load(f)
+                if os.path.exists(cached["path"]) and time.time() - cached["resolved_at"] < DRIVER_PATH_MAX_AGE:
+                    path = cached["path"]
+            except (OSError, ValueError, KeyError):
+                pass
+        if not path:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+            try:
+                os.makedirs(os.path.dirname(DRIVER_PATH_FILE), exist_ok=True)
+                with open(DRIVER_PATH_FILE, "w") as f:
+                    json.dump({"path": path, "resolved_at": time.time()}, f)
+            except OSError as e:
+                print(f"⚠️ Could not cache chromedriver path: {e}")
+        _driver_path = path
+        return path
+
+def build_driver():
+    """Start one headless Chrome with the shared options and resource blocking (a ReplayDriver in replay mode)."""
+    if REPLAY:
+        return ReplayDriver()
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import SessionNotCreatedException
+    try:
+        d = webdriver.Chrome(service=Service(chromedriver_path()), options=build_chrome_options())
+    except SessionNotCreatedException:
+        # Chrome was updated since the cached driver was resolved
+        d = webdriver.Chrome(service=Service(chromedriver_path(refresh=True)), options=build_chrome_options())
+    enable_resource_blocking(d)
+    return d
+
+class DriverPool:
+    """
+    Bounded pool of Chrome drivers. Drivers are started on first checkout
+    (never more than `size`) and reused by later tasks; acquire() blocks
+    while every driver is busy. A slot freed by a crashed driver or a failed
+    launch wakes one waiter, which starts a driver itself (and gets the
+    launch error if that fails too).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = []  # LIFO: the most recently used driver is reused first
+        self._lock = threading.Condition()
+        self._drivers = []
+        self.launch_seconds = []
+
+    def acquire(self):
+        with self._lock:
+            while not self._idle and len(self._drivers) >= self.size:
+                self._lock.wait()
+            if self._idle:
+                return self._idle.pop()
+            # reserve the slot before the (slow) Chrome launch
+            self._drivers.append(None)
+        started = time.perf_counter()
+        try:
+            d = build_driver()
+        except Exception:
+            with self._lock:
+                self._drivers.remove(None)
+                self._lock.notify()
+            raise
+        launched = time.perf_counter() - started
+        run_metrics.observe("launch", launched, browsers=1)
+        with self._lock:
+            self._drivers[self._drivers.index(None)] = d
+            self.launch_seconds.append(launched)
+        return d
+
+    def release(self, d, broken=False):
+        with self._lock:
+            if not broken:
+                self._idle.append(d)
+            elif d in self._drivers:
+                # a crashed session is quit and its slot freed for a fresh driver
+                self._drivers.remove(d)
+            self._lock.notify()
+        if broken:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            drivers = [d for d in self._drivers if d is not None]
+            self._drivers = []
+            self._idle = []
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+        launch = f" (started in {sum(self.launch_seconds):.1f}s total)" if self.launch_seconds else ""
+        print(f"🧹 Closed {len(drivers)} browser(s){launch}.")
+
+driver_pool = DriverPool(SCRAPER_POOL_SIZE)
+_task_state = threading.local()
+
+def current_driver():
+    """Driver checked out by the running task (checked out on first use)."""
+    d = getattr(_task_state, "driver", None)
+    if d is None:
+        d = driver_pool.acquire()
+        _task_state.driver = d
+    return d
+
+def release_current_driver():
+    d = getattr(_task_state, "driver", None)
+    if d is None:
+        return
+    _task_state.driver = None
+    broken = False
+    try:
+        d.current_url  # cheap liveness probe
+    except Exception:
+        broken = True
+    driver_pool.release(d, broken=broken)
+
+# -------------------------
+# HTTP FETCH TIER
+# Static, server-rendered pages are fetched over one pooled keep-alive
+# session; Chrome is only used for "browser" tier sources or when the HTTP
+# copy has none of the rows a source needs.
+# -------------------------
+HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "15"))
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+FETCH_STATS = Counter()
+_stats_lock = threading.Lock()
+_http_session = None
+_http_lock = threading.Lock()
+
+def count_fetch(kind, n=1):
+    with _stats_lock:
+        FETCH_STATS[kind] += n
+
+def http_session():
+    """Shared requests.Session with a connection pool sized for the run."""
+    global _http_session
+    with _http_lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504],
+                          allowed_methods=["GET", "HEAD"])
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(10, SCRAPER_POOL_SIZE * 4),
+                                  max_retries=retry)
+            session = requests.Session()
+            session.headers.update(HTTP_HEADERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_session = session
+        return _http_session
+
+def close_http_session():
+    global _http_session
+    with _http_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+# -------------------------
+# RECORD / REPLAY
+# SCRAPER_RECORD=1 saves every page a run fetches to the fixture store
+# (fixtures.py) under the source that asked for it. SCRAPER_REPLAY=1
+# serves those pages instead of the network: the HTTP tier reads the
+# recorded bodies and build_driver() returns a ReplayDriver. Replay turns
+# the response cache off so every page is parsed.
+# -------------------------
+RECORD = os.getenv("SCRAPER_RECORD", "0") == "1"
+REPLAY = os.getenv("SCRAPER_REPLAY", "0") == "1"
+fixture_store = FixtureStore()
+_page_sources = {}  # page url -> registry source name, noted by fetch_source_page() for the recorder
+
+def note_page_source(source, url):
+    if RECORD:
+        _page_sources[url] = source["name"]
+
+def record_page(url, kind, body, source=None):
+    """Save a fetched page as a fixture when recording."""
+    if not RECORD or not body:
+        return
+    try:
+        fixture_store.record(url, kind, body, source or _page_sources.get(url, ""))
+        count_fetch("recorded")
+    except OSError as e:
+        print(f"⚠️ Could not record {url}: {e}")
+
+def replay_entry(url):
+    """Recorded HTTP copy of url as a response-cache entry, or None."""
+    body = fixture_store.page(url, "http")
+    count_fetch("replayed" if body is not None else "replay_missing")
+    if body is None:
+        return None
+    return {"url": url, "body": body, "content_hash": content_hash(body), "fetched_at": time.time()}
+
+class ReplayDriver:
+    """
+    The part of the Chrome WebDriver API that safe_get(), wait_until_ready()
+    and record_network() use, serving recorded pages. A recorded page never
+    changes after get(), so a selector it lacks times out at once rather
+    than after the source's wait limit, and there is nothing to scroll.
+    """
+
+    def __init__(self):
+        self.current_url = ""
+        self.page_source = ""
+        self._soup = None
+
+    def get(self, url):
+        body = fixture_store.page(url, "browser")
+        count_fetch("replayed" if body is not None else "replay_missing")
+        self.current_url = url
+        self.page_source = body if body is not None else "<html><head></head><body></body></html>"
+        self._soup = None
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import TimeoutException
+        if self._soup is None:
+            self._soup = make_soup(self.page_source)
+        element = self._soup.select_one(value)
+        if element is None:
+            raise TimeoutException(f"{value!r} is not in the recorded page")
+        return element
+
+    def execute_script(self, script, *args):
+        return "complete" if "readyState" in script else 0
+
+    def get_log(self, kind):
+        return []
+
+    def quit(self):
+        self._soup = None
+
+# -------------------------
+# RESPONSE CACHE
+# Pages fetched over HTTP are kept in http_cache.ResponseCache. Within a
+# source's cache_ttl the cached copy is used without a request; after that it is
+# revalidated with If-None-Match / If-Modified-Since. Parsed rows are
+# cached by content hash, so unchanged pages skip BeautifulSoup entirely.
+# -------------------------
+# seconds a cached page is used without revalidation, unless its source sets cache_ttl
+CACHE_TTL = float(os.getenv("SCRAPER_CACHE_TTL", str(3 * 3600)))
+response_cache = ResponseCache(enabled=os.getenv("SCRAPER_CACHE", "1") == "1" and not REPLAY)
+
+def http_fetch(url, ttl=None):
+    """
+    GET url over the shared session through the response cache. Returns a
+    cache entry (body, content_hash, ...); raises PageLoadError when the
+    request fails or the reply isn't a 200 HTML page. A cached copy
+    younger than `ttl` (default CACHE_TTL) is returned without a request.
+    In replay mode the recorded copy is returned instead (None if none was
+    recorded).
+    """
+    if REPLAY:
+        return replay_entry(url)
+    import requests
+    entry = response_cache.get(url)
+    if response_cache.is_fresh(entry, CACHE_TTL if ttl is None else ttl):
+        count_fetch("cache_fresh")
+        return entry
+    with run_metrics.stage("fetch", http_pages=1) as counts:
+        try:
+            resp = http_session().get(url, timeout=HTTP_TIMEOUT, headers=response_cache.conditional_headers(entry))
+        except requests.RequestException as e:
+            counts["errors"] += 1
+            raise PageLoadError(f"HTTP fetch failed: {e}") from e
+        counts["bytes"] += len(resp.content)
+        if resp.status_code == 304 and entry:
+            count_fetch("cache_revalidated")
+            return response_cache.revalidated(url, entry)
+        if resp.status_code != 200 or "html" not in resp.headers.get("Content-Type", "html"):
+            counts["errors"] += 1
+            raise PageLoadError(f"HTTP {resp.status_code} ({resp.headers.get('Content-Type', '')})")
+        return response_cache.store(url, resp.text, resp.headers)
+
+def http_get(url):
+    """GET url (through the response cache) — return HTML text or None on failure."""
+    try:
+        entry = http_fetch(url)
+    except PageLoadError as e:
+        print(f"⚠️ HTTP fetch failed for {url}: {e}")
+        return None
+    return entry["body"] if entry else None
+
+# -------------------------
+# HTML PARSING
+# Pages are parsed with lxml when it is installed. A source may name the
+# only tags it needs (its "strain", e.g. ("table", "a")); a SoupStrainer
+# then skips everything else instead of building it into the tree. Trees
+# are decomposed as soon as their rows are extracted.
+# -------------------------
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+def make_soup(markup, strain=None):
+    from bs4 import BeautifulSoup, SoupStrainer
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=SoupStrainer(list(strain)) if strain else None)
+
+def extract_rows(soup, url, parse):
+    """parse(soup, url), freeing the tree straight after."""
+    try:
+        return parse(soup, url)
+    finally:
+        soup.decompose()
+
+def rows_from_entry(url, entry, parse, rows_selector=None, parse_key=None, strain=None):
+    """
+    Rows of an HTTP cache entry: the cached rows when the page's content
+    hash is unchanged, else freshly parsed (and cached). Returns None when
+    `rows_selector` matches nothing, i.e. the page needs a browser, and
+    raises PageBlocked instead when the copy is a captcha or login wall.
+    """
+    rows = response_cache.get_rows(url, entry["content_hash"], parse_key)
+    if rows is not None:
+        count_fetch("http")
+        count_fetch("parse_skipped")
+        return rows
+    with run_metrics.stage("parse", pages=1):
+        soup = make_soup(entry["body"], strain)
+        if rows_selector and not soup.select_one(rows_selector):
+            soup.decompose()
+            count_fetch("http_no_rows")
+            reason = detect_block(entry["body"])
+            if reason:
+                raise PageBlocked(f"{reason} in the HTTP copy of {url}")
+            return None
+        count_fetch("http")
+        rows = extract_rows(soup, url, parse)
+    response_cache.put_rows(url, entry["content_hash"], parse_key, rows)
+    return rows
 
 # -------------------------
 # FILTERS
@@ -57,7 +518,7 @@ INCLUDE_TERMS = [
     "power bi","tableau","excel","sql","dashboard","bi developer","data engineer",
     "nlp","llm","pandas","numpy","scikit-learn","tensorflow","pytorch","rest api","Data Analyst","Junior Data Analyst","Senior Data Analyst","Business Data Analyst",
 "Business Analyst","Reporting Analyst","Data Reporting Analyst","Operations Analyst","Product Analyst","Marketing Analyst","Financial Analyst","BI Analyst / Business Intelligence Analyst","Data Quality Analyst","Data Visualization Analyst",
-"Quantitative Analyst / Quant Analyst","Statistical Analyst","Data Science Analyst","Insights Analyst","Data Operations Analyst","Risk Analyst","Fraud Analyst","Workforce Analyst"
+"Quantitative Analyst / Quant Analyst","Statistical Analyst","Data Science Analyst","Insights Analyst","Data Operations Analyst","Risk Analyst","Fraud Analyst","Workforce Analyst",
 "Revenue Analyst","Research Analyst","Analytics Specialist","Decision Support Analyst","flutter",
     "dart",
     "flutter developer",
@@ -136,418 +597,1472 @@ INCLUDE_TERMS = [
 # Regex to detect high experience mentions (to be excluded)
 HIGH_EXPERIENCE_RE = re.compile(r"\b([3-9]|[1-9]\d)\+?\s*(year|years|yrs|yr)\b", flags=re.IGNORECASE)
 
+# -------------------------
+# KEYWORD MATCHER
+# The include / exclude / prefer lists are each compiled into one regex,
+# built once and rebuilt only when a list changes. Terms are factored into
+# a prefix trie so the engine dispatches on the next character instead of
+# trying every term at every position. Managerial words are already in
+# EXCLUDE_KEYWORDS and HIGH_EXPERIENCE_RE is folded into the exclude
+# pattern, so a title costs at most three regex scans.
+# -------------------------
+def _trie_pattern(node, last_char):
+    """Regex for a trie node; terms ending on a letter/digit get a word boundary and optional plural 's'."""
+    alternatives = [re.escape(ch) + _trie_pattern(child, ch) for ch, child in sorted(node.items()) if ch]
+    if "" in node:
+        alternatives.append(r"s?(?![a-z0-9])" if last_char.isalnum() else "")
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+def compile_terms(terms, extra_patterns=()):
+    """Compile a term list into one word-bounded regex (match it against lowercased text)."""
+    trie = {}
+    for t in terms:
+        # "BI Analyst / Business Intelligence Analyst" lists two titles
+        for part in t.lower().split(" / "):
+            part = part.strip()
+            if not part:
+                continue
+            node = trie
+            for ch in part:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+    # a term starting with a letter/digit must not continue a word ("ml" in "html")
+    word_start = {ch: child for ch, child in trie.items() if ch.isalnum()}
+    other_start = {ch: child for ch, child in trie.items() if not ch.isalnum()}
+    alternatives = []
+    if word_start:
+        alternatives.append(r"(?<![a-z0-9])" + _trie_pattern(word_start, ""))
+    if other_start:
+        alternatives.append(_trie_pattern(other_start, ""))
+    alternatives += list(extra_patterns)
+    return re.compile("|".join(alternatives) or r"(?!x)x")
+
+class KeywordMatcher:
+    """Compiled include/exclude/prefer lists; see match() and is_relevant()."""
+
+    def __init__(self, include, exclude, prefer):
+        # non-capturing copy so pandas .str.contains() accepts the pattern
+        experience = re.sub(r"(?<!\\)\((?!\?)", "(?:", HIGH_EXPERIENCE_RE.pattern)
+        self.experience_re = re.compile(experience)
+        self.include_re = compile_terms(include)
+        self.exclude_re = compile_terms(exclude, extra_patterns=[experience])
+        self.prefer_re = compile_terms(prefer)
+
+    def match(self, text):
+        """Which terms of each list occur in text: {"include": [...], "exclude": [...], "prefer": [...]}."""
+        text = text.lower()
+        return {
+            "include": [m.group(0) for m in self.include_re.finditer(text)],
+            "exclude": [m.group(0) for m in self.exclude_re.finditer(text)],
+            "prefer": [m.group(0) for m in self.prefer_re.finditer(text)],
+        }
+
+    def is_relevant(self, text):
+        text = text.lower()
+        if self.exclude_re.search(text):
+            return False
+        return self.include_re.search(text) is not None
+
+_matcher = None
+_matcher_key = None
+_matcher_lock = threading.Lock()
+
+def get_matcher():
+    """KeywordMatcher for the current filter lists (rebuilt only if they changed)."""
+    global _matcher, _matcher_key
+    key = [INCLUDE_TERMS, EXCLUDE_KEYWORDS, PREFER_TERMS]
+    if key != _matcher_key:
+        with _matcher_lock:
+            if key != _matcher_key:
+                _matcher = KeywordMatcher(INCLUDE_TERMS, EXCLUDE_KEYWORDS, PREFER_TERMS)
+                _matcher_key = [list(terms) for terms in key]
+    return _matcher
+
 # -------------------------
 # HELPERS: safety + scrolling + parsing
 # -------------------------
-def safe_get(url, wait_after=1.0):
-    """Open URL with driver.get — return BeautifulSoup or None on failure."""
+# Upper bound (seconds) on readiness waits unless a source sets wait_limit;
+# pages normally return as soon as their selector shows up.
+PAGE_WAIT_LIMIT = 8.0
+SCROLL_SETTLE = 1.5  # max seconds to wait for new content after each scroll
+WAIT_STATS = {}      # host -> load/scroll wait totals, see record_wait()
+
+def record_wait(url, kind, waited, timed_out=False):
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    with _stats_lock:
+        st = WAIT_STATS.setdefault(host, {"loads": 0, "load_s": 0.0, "scrolls": 0, "scroll_s": 0.0, "timeouts": 0})
+        st[f"{kind}s"] += 1
+        st[f"{kind}_s"] += waited
+        st["timeouts"] += int(timed_out)
+
+def wait_until_ready(d, url, ready_selector=None, max_wait=None):
+    """
+    Block until `ready_selector` is in the DOM (or, without a selector, until
+    document.readyState is complete), capped by `max_wait` (default PAGE_WAIT_LIMIT).
+    Returns True if the page became ready in time.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+    started = time.perf_counter()
+    if ready_selector:
+        condition = EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+    else:
+        condition = lambda drv: drv.execute_script("return document.readyState") == "complete"
+    try:
+        WebDriverWait(d, max_wait or PAGE_WAIT_LIMIT, poll_frequency=0.1).until(condition)
+        ready = True
+    except TimeoutException:
+        ready = False
+    record_wait(url, "load", time.perf_counter() - started, timed_out=not ready)
+    return ready
+
+# Pages that will never hold rows however long we wait. Only checked once a
+# page has no rows, so a job page with a reCAPTCHA'd apply form isn't flagged.
+BLOCK_MARKERS = {
+    "captcha": re.compile(
+        r"g-recaptcha|h-captcha|hcaptcha\.com|cf-challenge|challenge-platform|captcha-delivery|"
+        r"are you a robot|unusual traffic from your|verify (?:that )?you are (?:a )?human", re.IGNORECASE),
+    "login wall": re.compile(
+        r"authwall|sign ?in to (?:view|continue|see)|join now to see|log ?in to (?:view|continue|see)",
+        re.IGNORECASE),
+}
+LOGIN_PATH_RE = re.compile(r"/(?:login|signin|sign-in|authwall|uas/login|checkpoint|accounts/login)\b",
+                           re.IGNORECASE)
+BLOCK_SCAN_CHARS = 200_000  # challenge and login pages are small; don't regex a whole listing
+
+class PageLoadError(Exception):
+    """The page could not be loaded: a failed or non-200 HTTP fetch, or the browser failed."""
+
+class PageBlocked(Exception):
+    """The page is a captcha or login wall; retrying the source won't help."""
+
+class CircuitOpen(Exception):
+    """The source's circuit breaker opened while the page waited for a browser."""
+
+def detect_block(markup, final_url=""):
+    """"captcha" / "login wall" if the page (or the URL it ended on) is one, else None."""
+    if LOGIN_PATH_RE.search(urllib.parse.urlsplit(final_url).path):
+        return "login wall"
+    head = markup[:BLOCK_SCAN_CHARS]
+    for reason, pattern in BLOCK_MARKERS.items():
+        if pattern.search(head):
+            return reason
+    return None
+
+def safe_get(url, ready_selector=None, max_wait=None, scrolls=0, strain=None, breaker=None):
+    """
+    Open URL with driver.get, wait for readiness and scroll `scrolls` times —
+    return BeautifulSoup (of just the `strain` tags, if given) or None on failure.
+    Raises PageBlocked, without scrolling, when a page that never showed
+    `ready_selector` is a captcha or login wall, and CircuitOpen when
+    `breaker` opened while waiting for a browser.
+    """
+    from selenium.common.exceptions import WebDriverException
     try:
-        driver.get(url)
-        time.sleep(wait_after)
-        return BeautifulSoup(driver.page_source, "html.parser")
+        d = current_driver()
+        if breaker and not breaker.allow():
+            raise CircuitOpen(url)
+        with run_metrics.stage("fetch", browser_pages=1) as counts:
+            d.get(url)
+            ready = wait_until_ready(d, url, ready_selector, max_wait)
+            markup = d.page_source
+            if not ready:
+                reason = detect_block(markup, d.current_url)
+                if reason:
+                    record_network(d, url)
+                    record_page(url, "browser", markup)
+                    raise PageBlocked(f"{reason} at {d.current_url}")
+            if scrolls and not REPLAY:  # recorded pages were saved after scrolling
+                scroll_page(max_scrolls=scrolls, max_wait=max_wait)
+                markup = d.page_source
+            record_network(d, url)
+            record_page(url, "browser", markup)
+            counts["bytes"] += len(markup)
+        with run_metrics.stage("parse", pages=1):
+            return make_soup(markup, strain)
     except WebDriverException as e:
         print(f"⚠️ Could not load {url}: {e}")
         return None
 
-def scroll_page(pause=0.5, scrolls=6):
-    """Scroll the page to trigger lazy loading (Selenium context)."""
+def fetch_rows(url, parse, rows_selector=None, parse_key=None, browser=False,
+               max_wait=None, ttl=None, scrolls=0, strain=None, breaker=None):
+    """
+    Fetch url and return parse(soup, url). HTTP first, browser as fallback:
+    Chrome is used when `browser` is set or `rows_selector` matches nothing
+    in a 200 HTTP copy (the browser then waits for that selector, up to
+    `max_wait`, and scrolls `scrolls` times). A failed request or a non-200
+    reply raises PageLoadError, a page failure, without a browser. Rows
+    parsed from an HTTP copy are cached under the page's content hash and
+    `parse_key` (default the parser's name), so a page whose bytes haven't
+    changed is not re-parsed. Only the `strain` tags are built, if given.
+    Raises PageLoadError when the browser can't load the page, PageBlocked
+    when it is a captcha or login wall, CircuitOpen when `breaker` opened
+    before a browser was free.
+    """
+    parse_key = parse_key or parse.__name__
+    if not browser:
+        entry = http_fetch(url, ttl)
+        if entry:
+            record_page(url, "http", entry["body"])
+            rows = rows_from_entry(url, entry, parse, rows_selector, parse_key, strain)
+            if rows is not None:
+                return rows
+    count_fetch("browser")
+    soup = safe_get(url, ready_selector=rows_selector, max_wait=max_wait, scrolls=scrolls, strain=strain,
+                    breaker=breaker)
+    if soup is None:
+        raise PageLoadError("page did not load")
+    with run_metrics.stage("parse"):
+        return extract_rows(soup, url, parse)
+
+def scroll_page(max_scrolls=8, max_wait=None):
+    """
+    Scroll to the bottom until the document stops growing (Selenium context).
+    Each scroll waits at most SCROLL_SETTLE for new content; the whole loop is
+    capped by `max_wait` (default PAGE_WAIT_LIMIT).
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+    started = time.perf_counter()
+    url = ""
     try:
-        for _ in range(scrolls):
-            driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
-            time.sleep(pause)
+        d = current_driver()
+        url = d.current_url
+        deadline = started + (max_wait or PAGE_WAIT_LIMIT)
+        height_js = "return document.body.scrollHeight"
+        height = d.execute_script(height_js)
+        for _ in range(max_scrolls):
+            d.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            settle = min(SCROLL_SETTLE, deadline - time.perf_counter())
+            if settle <= 0:
+                break
+            try:
+                WebDriverWait(d, settle, poll_frequency=0.1).until(
+                    lambda drv: drv.execute_script(height_js) > height)
+            except TimeoutException:
+                break  # height stopped growing — nothing more to load
+            height = d.execute_script(height_js)
     except Exception:
         pass
+    record_wait(url, "scroll", time.perf_counter() - started)
+
+def print_wait_stats():
+    for host, st in sorted(WAIT_STATS.items()):
+        print(f"   ⏱️ {host}: {st['loads']} load(s) waited {st['load_s']:.1f}s, "
+              f"{st['scrolls']} scroll(s) waited {st['scroll_s']:.1f}s, {st['timeouts']} timeout(s)")
 
 def text_clean(s):
     return (s or "").strip()
 
 def looks_relevant(title, snippet=""):
-    text = f"{title} {snippet}".lower()
-
-    # exclude if explicit exclude tokens present
-    if any(ex in text for ex in EXCLUDE_LOWER):
-        return False
-
-    # must contain at least one include term
-    if not any(term in text for term in INCLUDE_TERMS):
-        return False
-
-    # explicit high experience -> exclude
-    if re.search(HIGH_EXPERIENCE_RE, text):
-        return False
+    """
+    True if the text hits an include term and no exclude term (tech stacks we
+    don't place, senior/managerial titles, 3+ years). Prefer terms (fresher,
+    intern, ...) are never required; they rank a job higher (score_jobs).
+    """
+    return get_matcher().is_relevant(f"{title} {snippet}")
 
-    # exclude managerial words
-    if re.search(r"\b(senior|lead|manager|director|principal|head|vp)\b", text):
-        return False
+def match_terms(title, snippet=""):
+    """Include/exclude/prefer terms found in the text, for debugging filters."""
+    return get_matcher().match(f"{title} {snippet}")
 
-    # prefer fresher/trainee terms but not mandatory
-    if any(p in text for p in PREFER_LOWER):
-        return True
+# Reason codes returned by classify_jobs(), in order of precedence.
+REASON_CODES = ("no_title", "high_experience", "excluded", "no_include", "preferred", "accepted")
 
-    # otherwise accept general relevant roles (non-senior)
-    return True
+def classify_jobs(candidates):
+    """
+    Vectorized looks_relevant() over every raw candidate of a run.
+    `candidates` are dicts with a title and an optional snippet (portals use
+    the company). Returns (mask, reasons): a boolean numpy array of rows to
+    keep and a reason code per row from REASON_CODES.
+    """
+    import numpy as np
+    import pandas as pd
+    if not candidates:
+        return np.zeros(0, dtype=bool), np.array([], dtype=object)
+    m = get_matcher()
+    df = pd.DataFrame.from_records(candidates, columns=["title", "snippet"]).fillna("").astype(object)
+    title = df["title"].str.strip()
+    text = (title + " " + df["snippet"]).str.lower()
+
+    # each rule only scans the rows still undecided (exclude_re covers 3+ years)
+    reasons = np.full(len(df), "accepted", dtype=object)
+    excluded = text.str.contains(m.exclude_re).to_numpy(dtype=bool)
+    reasons[excluded] = "excluded"
+    high_exp = text[excluded].str.contains(m.experience_re).to_numpy(dtype=bool)
+    reasons[np.flatnonzero(excluded)[high_exp]] = "high_experience"
+    rest = np.flatnonzero(~excluded)
+    included = text.iloc[rest].str.contains(m.include_re).to_numpy(dtype=bool)
+    reasons[rest[~included]] = "no_include"
+    rest = rest[included]
+    preferred = text.iloc[rest].str.contains(m.prefer_re).to_numpy(dtype=bool)
+    reasons[rest[preferred]] = "preferred"
+    reasons[(title == "").to_numpy()] = "no_title"
+    mask = (reasons == "preferred") | (reasons == "accepted")
+    return mask, reasons
 
 def normalize_job(job):
-    return {
+    normalized = {
         "title": text_clean(job.get("title","")),
         "company": text_clean(job.get("company","")),
-        "link": text_clean(job.get("link",""))
+        "link": canonical_link(text_clean(job.get("link",""))),
+        "source": job.get("source", "")
     }
+    if job.get("search"):
+        normalized["search"] = job["search"]  # fanned-out search that found it, for the per-term report
+    for key in ("page", "position", "page_url"):  # where it was listed, for job_order() / enrichment
+        if key in job:
+            normalized[key] = job[key]
+    return normalized
+
+# Pages arrive in whatever order the threads finish them; job_order() puts
+# jobs back in registry order (SOURCES), then search, page and position on
+# the page. Dedupe merges in this order (the earliest listing's fields
+# win), and rank ties and jobs.csv follow it, so every run of the same
+# pages agrees.
+SOURCE_RANK = {src["name"]: i for i, src in enumerate(SOURCES)}
+
+def job_order(job):
+    return (SOURCE_RANK.get(job.get("source"), len(SOURCE_RANK)), job.get("search") or "", job.get("page") or 0,
+            job.get("position") or 0, job.get("link") or "", job.get("title") or "", job.get("company") or "")
 
-def dedupe_jobs(jobs):
-    seen = set()
-    unique = []
-    for j in jobs:
-        key = (j.get("title","").lower(), j.get("company","").lower())
-        if key not in seen:
-            seen.add(key)
-            unique.append(j)
-    return unique
+# -------------------------
+# INCREMENTAL RUNS
+# Every candidate is recorded in the seen-jobs store (job_store.py). While
+# paging, a source stops after the first page whose jobs were all seen by
+# an earlier run; with SCRAPER_DELTA_ONLY=1 only first-seen jobs are returned.
+# -------------------------
+EARLY_STOP = os.getenv("SCRAPER_EARLY_STOP", "1") == "1"
+DELTA_ONLY = os.getenv("SCRAPER_DELTA_ONLY", "0") == "1"
+_seen_keys = None  # fingerprints + canonical links, snapshot taken by stream_jobs before scraping
+
+def page_all_known(page_jobs):
+    """True when every job on the page was seen by an earlier run (or the page is empty)."""
+    if _seen_keys is None:
+        return False
+    return all(is_known(j, _seen_keys) for j in page_jobs if j.get("title"))
+
+# -------------------------
+# PAGE BUDGETS
+# A paginated listing source fetches a page budget rather than a fixed
+# count. The first run uses its registry "pages"; every run records how many
+# relevant jobs each page produced (job_store.page_yield), and the next
+# budget is one page past the deepest page that yielded a relevant job in
+# the last PAGE_HISTORY_RUNS runs, doubled while the last run was still
+# yielding on its final page, within 1..max_pages. Paging also ends at the
+# first empty page or at a page repeating the one before it (sites that
+# clamp out-of-range page numbers to the last page).
+# -------------------------
+PAGE_HISTORY_RUNS = 5
+PAGING_STATS = {}   # paging key -> {"source", "budget", "pages", "stop"}, reported and recorded by stream_jobs
+_page_budgets = {}  # paging key -> pages to fetch in the run in progress
+
+def is_paginated(source):
+    return source["kind"] == "listing" and "{page}" in source["url"]
+
+def paging_key(name, label=""):
+    """Name budgets and page history are kept under: the source's, or "Indeed [python]" for one of its searches."""
+    return f"{name} [{label}]" if label else name
+
+def page_budget(source, runs):
+    """Pages to fetch from `source` given its recent runs (newest first, see job_store.load_page_history)."""
+    if not runs:
+        return source["pages"]
+    newest = runs[0]
+    if newest["stop"] == "budget" and newest["relevant"] and newest["relevant"][-1]:
+        budget = newest["budget"] * 2  # cut off while still yielding
+    else:
+        # runs stopped by early stop, errors or the circuit breaker say nothing about depth
+        complete = [r for r in runs if r["stop"] in ("empty", "repeat", "budget")]
+        if not complete:
+            budget = newest["budget"]
+        else:
+            budget = 2 + max(max((i for i, n in enumerate(r["relevant"]) if n), default=-1) for r in complete)
+    return max(1, min(budget, source["max_pages"]))
+
+def page_signature(page_jobs):
+    return frozenset((j.get("title", ""), j.get("link", "")) for j in page_jobs)
+
+def page_stop(page_jobs, previous, early=False):
+    """Why paging ends at this page ("empty", "repeat", "known") or None to continue."""
+    if not page_jobs:
+        return "empty"
+    if previous is not None and page_signature(page_jobs) == page_signature(previous):
+        return "repeat"
+    if early and page_all_known(page_jobs):
+        return "known"
+    return None
+
+def finish_paging(source, urls, pages, stop, label=""):
+    """Record in PAGING_STATS how a paginated search's `pages` kept pages of `urls` ended."""
+    if not is_paginated(source):
+        return
+    breaker = breaker_for(source)
+    if breaker.tripped:
+        stop = "breaker"
+    elif stop == "empty" and breaker.failures:
+        stop = "error"  # maybe a failed page rather than the end
+    with _stats_lock:
+        PAGING_STATS[paging_key(source["name"], label)] = {"source": source["name"], "budget": len(urls),
+                                                            "pages": pages, "stop": stop}
+
+def record_paging(counts):
+    """
+    Store the pages of this run's paginated searches given {(paging key,
+    page): [candidates, relevant]}; returns {key: {"source", "budget",
+    "stop", "relevant": [per page]}}.
+    """
+    runs = {name: {"budget": st["budget"], "stop": st["stop"],
+                   "pages": [tuple(counts.get((name, i), (0, 0))) for i in range(st["pages"])]}
+            for name, st in PAGING_STATS.items()}
+    record_page_yield(runs)
+    return {name: {"source": PAGING_STATS[name]["source"], "budget": r["budget"], "stop": r["stop"],
+                   "relevant": [n for _, n in r["pages"]]}
+            for name, r in runs.items()}
+
+def print_paging_stats(runs, history):
+    by_name = {src["name"]: src for src in SOURCES}
+    for name, run in sorted(runs.items()):
+        next_budget = page_budget(by_name[run["source"]], [run] + history.get(name, [])[:PAGE_HISTORY_RUNS - 1])
+        print(f"   📄 {name}: {len(run['relevant'])}/{run['budget']} page(s), stopped by {run['stop']}, "
+              f"relevant per page {run['relevant']} → next budget {next_budget}")
 
 # -------------------------
-# SITE-SPECIFIC SCRAPERS
+# SCRAPING ENGINE
+# Sources run side by side on "source" threads; pages of a paginated source
+# fan out to "page" threads. Browsers come from driver_pool, so at most
+# SCRAPER_POOL_SIZE Chrome instances exist however many threads are waiting.
+# -------------------------
+_page_executor = None
+_page_workers = 1
+
+def run_task(fn, *args, **kwargs):
+    """Run one scraping task and always hand its driver back to the pool."""
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        release_current_driver()
+
+def run_parallel(fn, items):
+    """
+    Call fn(item) for every item and return the results in the order of
+    `items`. Uses the page executor while a run is scraping,
+    otherwise runs inline.
+    """
+    items = list(items)
+    if _page_executor is None or len(items) < 2:
+        return [fn(item) for item in items]
+    # don't sit on a browser while other threads need one for these pages
+    release_current_driver()
+    futures = [_page_executor.submit(run_task, fn, item) for item in items]
+    return [f.result() for f in futures]
+
+def paginate(fetch_page, pages, on_page, stop_early=False, window=None):
+    """
+    Fetch pages in windows of `window` (default one per page worker), in
+    page order, until page_stop() ends paging. With `stop_early`, a page
+    that holds nothing new ends it too. Every page kept (the ending page
+    too, unless it was empty or a repeat) goes to on_page(index, jobs, url)
+    as soon as its window is in. Returns (pages kept, stop reason), "budget"
+    when every page was fetched.
+    """
+    pages = list(pages)
+    early = stop_early and _seen_keys is not None
+    window = window or (_page_workers if _page_executor is not None else 1)
+    kept, previous = 0, None
+    for start in range(0, len(pages), window):
+        batch = pages[start:start + window]
+        for url, page_jobs in zip(batch, run_parallel(fetch_page, batch)):
+            stop = page_stop(page_jobs, previous, early)
+            if stop not in ("empty", "repeat"):
+                on_page(kept, page_jobs, url)
+                kept, previous = kept + 1, page_jobs
+            if stop:
+                count_fetch("pages_skipped", max(0, len(pages) - start - window))
+                return kept, stop
+    return kept, "budget"
+
+# -------------------------
+# SOURCE HEALTH
+# Every source runs under a CircuitBreaker: a wall-clock budget
+# (time_budget) and a failure counter (max_failures). A page that fails to
+# load counts as a failure; a captcha or login wall, an exhausted budget or
+# max_failures failures trip the breaker, and the rest of the source's pages
+# are skipped without a request; so does a run in which none of its pages
+# loaded. A tripped source is also skipped by later runs (state in
+# job_store.py) for SCRAPER_BREAKER_COOLDOWN seconds, doubling with every
+# consecutive trip; a run that doesn't trip resets it. The default is a
+# day and an hour, so the next daily scheduled run (which may start a
+# little late) skips a source that tripped.
+# -------------------------
+BREAKER_COOLDOWN = float(os.getenv("SCRAPER_BREAKER_COOLDOWN", str(25 * 3600)))
+BREAKER_MAX_COOLDOWN = 7 * 24 * 3600
+_breakers = {}  # source name -> CircuitBreaker of the run in progress, created at its first page
+
+class CircuitBreaker:
+    """Run-time budget and failure count of one source."""
+
+    def __init__(self, source):
+        self.name = source["name"]
+        self.max_failures = source["max_failures"]
+        self.deadline = time.monotonic() + source["time_budget"] if source["time_budget"] else None
+        self.failures = 0
+        self.pages = 0
+        self.reason = None
+        self._lock = threading.Lock()
+
+    @property
+    def tripped(self):
+        return self.reason is not None
+
+    def trip(self, reason):
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+                print(f"🔌 {self.name}: circuit open ({reason}), skipping its remaining pages")
+
+    def allow(self):
+        """False once tripped; trips on an exhausted time budget."""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.trip("time budget exhausted")
+        return not self.tripped
+
+    def failed(self, url, exc):
+        """Count a page that raised `exc`; a captcha or login wall trips at once."""
+        if isinstance(exc, PageBlocked):
+            self.trip(str(exc))
+            return
+        with self._lock:
+            self.failures += 1
+            trip = self.max_failures and self.failures >= self.max_failures
+        if trip:
+            self.trip(f"{self.failures} failure(s), last {type(exc).__name__} on {url}")
+
+    def succeeded(self):
+        with self._lock:
+            self.pages += 1
+
+def breaker_for(source):
+    """The run's breaker of `source`, created on first use."""
+    with _stats_lock:
+        if source["name"] not in _breakers:
+            _breakers[source["name"]] = CircuitBreaker(source)
+        return _breakers[source["name"]]
+
+def open_sources(sources, health):
+    """Split `sources` into (runnable, skipped) by the circuits persisted in `health`."""
+    now = time.time()
+    runnable, skipped = [], []
+    for src in sources:
+        h = health.get(src["name"])
+        (skipped if h and h["open_until"] > now else runnable).append(src)
+    return runnable, skipped
+
+def update_health(health):
+    """Fold this run's breakers into `health`; returns the changed entries."""
+    now = time.time()
+    changed = {}
+    for name, breaker in _breakers.items():
+        if breaker.failures and not breaker.pages and not breaker.tripped:
+            breaker.reason = "no page loaded"  # e.g. a dead domain
+        prev = health.get(name, {"trips": 0, "open_until": 0, "reason": None})
+        if breaker.tripped:
+            trips = prev["trips"] + 1
+            cooldown = min(BREAKER_COOLDOWN * 2 ** (trips - 1), BREAKER_MAX_COOLDOWN)
+            changed[name] = {"trips": trips, "open_until": now + cooldown, "reason": breaker.reason}
+        elif prev["trips"]:
+            changed[name] = {"trips": 0, "open_until": 0, "reason": None}  # healthy again
+    return changed
+
+def print_breaker_stats(skipped, health):
+    for src in skipped:
+        h = health[src["name"]]
+        until = datetime.fromtimestamp(h["open_until"]).strftime("%Y-%m-%d %H:%M")
+        print(f"   ⛔ {src['name']}: skipped, circuit open until {until} ({h['reason']})")
+    for name, breaker in sorted(_breakers.items()):
+        if breaker.tripped:
+            print(f"   🔌 {name}: tripped after {breaker.pages} page(s), {breaker.failures} failure(s) "
+                  f"— {breaker.reason}")
+
+# -------------------------
+# SOURCE EXECUTOR
+# Sources are declared in sources.SOURCES; run_source() runs any of them.
 # Note: Many sites change UI frequently. These are robust, best-effort scrapers.
+# They return raw candidates; filtering happens once per run in classify_jobs().
 # -------------------------
+def fetch_source_page(source, url, parse=None, step="rows"):
+    """
+    Fetch and parse one page of `source` with its tier and budgets under its
+    circuit breaker; errors and pages skipped by an open circuit yield [].
+    """
+    breaker = breaker_for(source)
+    if not breaker.allow():
+        return []
+    note_page_source(source, url)
+    parse = parse or source["parse"]
+    try:
+        rows = fetch_rows(url, functools.partial(parse, source=source), rows_selector=source["rows"],
+                          parse_key=parse_key(source, step), browser=source["tier"] == "browser",
+                          max_wait=source["wait_limit"], ttl=source["cache_ttl"], scrolls=source["scrolls"],
+                          strain=source["strain"], breaker=breaker)
+    except CircuitOpen:
+        return []
+    except Exception as e:
+        print(f"⚠️ {source['name']} fetch error on {url}: {e}")
+        breaker.failed(url, e)
+        return []
+    breaker.succeeded()
+    return rows
+
+# SCRAPER_FAN_OUT=1 searches every fan_out source once per query term (and location)
+FAN_OUT = os.getenv("SCRAPER_FAN_OUT", "0") == "1"
+
+def run_search(source, search):
+    """Page through one search of a listing source (see sources.source_queries) up to its page budget."""
+    label = search["label"]
+    urls = source_urls(source, _page_budgets.get(paging_key(source["name"], label)), search["terms"],
+                       search["location"])
+    pages, stop = paginate(lambda url: fetch_source_page(source, url), urls,
+                           lambda i, page_jobs, url: emit_page(source, page_jobs, url, i, label),
+                           stop_early=len(urls) > 1, window=1 if source["sequential"] else None)
+    finish_paging(source, urls, pages, stop, label)
+
+def run_source(source):
+    """
+    Scrape one registry source, handing every page of raw candidates to
+    emit_page() as soon as it is parsed. Listing sources page through
+    source_urls() up to their page budget, a fan_out source runs its
+    searches query_concurrency at a time; hub sources are crawled by
+    crawl_hub().
+    """
+    if source["kind"] == "hub":
+        crawl_hub(source)
+        return
+    searches = source_queries(source, FAN_OUT)
+    if len(searches) == 1:
+        run_search(source, searches[0])
+        return
+    # pages still go through the shared page threads and driver pool
+    release_current_driver()
+    with ThreadPoolExecutor(max_workers=source["query_concurrency"], thread_name_prefix="search") as ex:
+        futures = [(search, ex.submit(run_task, run_search, source, search)) for search in searches]
+        for search, f in futures:
+            if f.exception():
+                print(f"⚠️ {paging_key(source['name'], search['label'])} search failed: {f.exception()}")
 
-# 1) Infopark (Kerala)
-def fetch_infopark_jobs(pages=5):
-    jobs = []
-    for page in range(1, pages+1):
-        url = f"https://infopark.in/companies/job-search?page={page}"
-        soup = safe_get(url, wait_after=1.2)
-        if not soup:
-            continue
-        rows = soup.select("table tr")
-        if not rows:
-            # fallback: anchors
-            anchors = soup.find_all("a", href=True)
-            for a in anchors:
-                t = a.get_text(strip=True)
-                if looks_relevant(t):
-                    link = a['href']
-                    if not link.startswith("http"):
-                        link = urllib.parse.urljoin(url, link)
-                    jobs.append({"title": t, "company": "Infopark", "link": link})
-            continue
-        for row in rows[1:]:
-            cols = row.find_all("td")
-            if len(cols) < 3:
-                continue
-            title = cols[1].get_text(strip=True)
-            company = cols[2].get_text(strip=True)
-            a = row.find("a", href=True)
-            link = a["href"] if a else ""
-            if link and not link.startswith("http"):
-                link = urllib.parse.urljoin(url, link)
-            if looks_relevant(title):
-                jobs.append({"title": title, "company": company or "Infopark", "link": link})
-    return jobs
-
-# 2) Technopark (Kerala)
-def fetch_technopark_jobs(pages=5):
-    jobs = []
-    for page in range(1, pages+1):
-        url = f"https://technopark.in/job-search?page={page}"
-        soup = safe_get(url, wait_after=1.2)
-        if not soup:
-            continue
-        rows = soup.select("table tr")
-        if rows and len(rows) > 1:
-            for row in rows[1:]:
-                cols = row.find_all("td")
-                if len(cols) < 3:
-                    continue
-                title = cols[1].get_text(strip=True)
-                company = cols[2].get_text(strip=True)
-                a = row.find("a", href=True)
-                link = a["href"] if a else ""
-                if link and not link.startswith("http"):
-                    link = urllib.parse.urljoin(url, link)
-                if looks_relevant(title):
-                    jobs.append({"title": title, "company": company or "Technopark", "link": link})
-        else:
-            # fallback: find possible job tiles
-            anchors = soup.find_all("a", href=True)
-            for a in anchors:
-                t = a.get_text(strip=True)
-                if looks_relevant(t):
-                    link = a['href']
-                    if link and not link.startswith("http"):
-                        link = urllib.parse.urljoin(url, link)
-                    jobs.append({"title": t, "company": "Technopark", "link": link})
-    return jobs
-
-# 3) Cyberpark (Kozhikode)
-def fetch_cyberpark_jobs():
-    jobs = []
-    url = "https://cyberparks.in/careers"
-    soup = safe_get(url, wait_after=1.2)
-    if not soup:
-        return jobs
-    # find likely anchors/cards
-    anchors = soup.select("a[href*='job'], a[href*='career'], .job, .career, .vacancy, .job-card")
-    if not anchors:
-        anchors = soup.find_all("a", href=True)
-    for a in anchors:
-        t = a.get_text(strip=True)
-        if not t:
-            continue
-        link = a['href']
-        if link and not link.startswith("http"):
-            link = urllib.parse.urljoin(url, link)
-        if looks_relevant(t):
-            jobs.append({"title": t, "company": "Cyberpark", "link": link})
-    return jobs
-
-# 4) SmartCity Kochi
-def fetch_smartcity_jobs():
-    jobs = []
-    url = "https://smartcitykochi.in/careers"
-    soup = safe_get(url, wait_after=1.2)
-    if not soup:
-        return jobs
-    anchors = soup.select("a[href*='job'], a[href*='career'], .vacancy, .career-item, .job-card")
-    if not anchors:
-        anchors = soup.find_all("a", href=True)
-    for a in anchors:
-        t = a.get_text(strip=True)
-        if not t: continue
-        link = a['href']
-        if link and not link.startswith("http"):
-            link = urllib.parse.urljoin(url, link)
-        if looks_relevant(t):
-            jobs.append({"title": t, "company": "SmartCity Kochi", "link": link})
-    return jobs
-
-# 5) TIDEL Park (Chennai)
-def fetch_tidelpark_jobs():
-    jobs = []
-    url = "https://www.tidelpark.com/careers"
-    soup = safe_get(url, wait_after=1.2)
-    if not soup:
-        return jobs
-    anchors = soup.select("a[href*='career'], a[href*='job'], .career, .vacancy")
-    for a in anchors:
-        t = a.get_text(strip=True)
-        if not t: continue
-        link = a['href']
-        if link and not link.startswith("http"):
-            link = urllib.parse.urljoin(url, link)
-        if looks_relevant(t):
-            jobs.append({"title": t, "company": "TIDEL Park Chennai", "link": link})
-    return jobs
-
-# 6) STPI (India)
-def fetch_stpi_jobs():
-    jobs = []
-    url = "https://www.stpi.in/career"
-    soup = safe_get(url, wait_after=1.2)
-    if not soup:
-        return jobs
-    anchors = soup.select("a[href*='career'], a[href*='job'], .vacancy, .career")
-    for a in anchors:
-        t = a.get_text(strip=True)
-        if not t: continue
-        link = a['href']
-        if link and not link.startswith("http"):
-            link = urllib.parse.urljoin(url, link)
-        if looks_relevant(t):
-            jobs.append({"title": t, "company": "STPI India", "link": link})
-    return jobs
-
-# 7) Bengaluru parks — generic approach: Manyata / ITPB / Embassy / Ecospace (public pages vary)
-def fetch_bengaluru_generic(url):
-    jobs = []
-    soup = safe_get(url, wait_after=1.2)
-    if not soup:
-        return jobs
-    # find career/job links
-    anchors = soup.find_all("a", href=True)
-    for a in anchors:
-        href = a['href']
-        text = a.get_text(strip=True)
-        if not text: continue
-        if "career" in href.lower() or "job" in href.lower() or "career" in text.lower() or "vacancy" in text.lower():
-            link = href if href.startswith("http") else urllib.parse.urljoin(url, href)
-            # fetch that page and extract job anchors
-            s2 = safe_get(link, wait_after=1.0)
-            if not s2: continue
-            for a2 in s2.find_all("a", href=True):
-                t2 = a2.get_text(strip=True)
-                if not t2: continue
-                if looks_relevant(t2):
-                    link2 = a2['href']
-                    if not link2.startswith("http"):
-                        link2 = urllib.parse.urljoin(link, link2)
-                    jobs.append({"title": t2, "company": url.split("//")[-1].split("/")[0], "link": link2})
-    return jobs
-
-# 8) Indeed (India) — search-based
-def fetch_indeed_jobs(query_terms=None, pages=3):
-    jobs = []
-    if query_terms is None:
-        query_terms = ["python", "data analyst", "data scientist", "machine learning", "react", "full stack"]
-    base_query = "+".join([urllib.parse.quote_plus(q) for q in query_terms])
-    for page in range(0, pages):
-        start = page * 10
-        url = f"https://www.indeed.co.in/jobs?q={base_query}&l=India&start={start}"
-        try:
-            driver.get(url)
-            time.sleep(2)
-            scroll_page(pause=0.7, scrolls=5)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            cards = soup.select("a[data-jk], .job_seen_beacon, .result")
-            if not cards:
-                cards = soup.select("a[href*='/rc/clk']")
-            for c in cards:
-                # try multiple ways to obtain title/company/link
-                title = ""
-                company = ""
-                link = ""
-                try:
-                    title_el = c.select_one("h2.jobTitle, .jobTitle, .title")
-                    if title_el:
-                        title = title_el.get_text(strip=True)
-                except Exception:
-                    title = c.get_text(strip=True)[:120]
-                # company
-                comp_el = c.select_one(".companyName, .company")
-                if comp_el:
-                    company = comp_el.get_text(strip=True)
-                # link
-                if c.has_attr("data-jk"):
-                    link = f"https://www.indeed.co.in/viewjob?jk={c['data-jk']}"
-                elif c.has_attr("href"):
-                    link = c["href"]
-                    if not link.startswith("http"):
-                        link = urllib.parse.urljoin(url, link)
-                if not title:
-                    title = c.get_text(strip=True)[:120]
-                if looks_relevant(title, company):
-                    jobs.append({"title": title, "company": company or "Indeed", "link": link})
-        except Exception as e:
-            print(f"⚠️ Indeed fetch error page {page}: {e}")
-            continue
-    return jobs
-
-# 9) Naukri (India) — search-based
-def fetch_naukri_jobs(query_terms=None, pages=3):
-    jobs = []
-    if query_terms is None:
-        query_terms = ["python", "data analyst", "data scientist", "machine learning", "react", "full stack"]
-    base_query = "%20".join([urllib.parse.quote_plus(q) for q in query_terms])
-    for page in range(1, pages+1):
-        url = f"https://www.naukri.com/{base_query}-jobs-{page}"
-        try:
-            driver.get(url)
-            time.sleep(2)
-            scroll_page(pause=0.7, scrolls=4)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            cards = soup.select(".jobTuple, .jobTuple .title, .jobCard, .list")
-            if not cards:
-                cards = soup.find_all("a", href=True)
-            for c in cards:
-                title = c.get_text(strip=True)[:140]
-                # try to find company nearby
-                # often company is in .company or .orgName
-                company = ""
-                comp_el = c.select_one(".company, .orgName, .companyName")
-                if comp_el:
-                    company = comp_el.get_text(strip=True)
-                link = ""
-                if c.name == "a" and c.has_attr("href"):
-                    link = c["href"]
-                if link and not link.startswith("http"):
-                    link = urllib.parse.urljoin(url, link)
-                if looks_relevant(title, company):
-                    jobs.append({"title": title, "company": company or "Naukri", "link": link})
-        except Exception as e:
-            print(f"⚠️ Naukri fetch error page {page}: {e}")
-            continue
-    return jobs
-
-# 10) LinkedIn (best-effort — may be blocked)
-def fetch_linkedin_jobs(query_terms=None, pages=2):
-    """
-    Best-effort. LinkedIn blocks scraping aggressively.
-    This function searches LinkedIn jobs page for the query — it may return empty or require login.
-    Use responsibly; consider LinkedIn API instead if you need reliable results.
-    """
-    jobs = []
-    if query_terms is None:
-        query_terms = ["python", "data analyst", "data scientist", "machine learning", "react", "full stack"]
-    q = "%20".join([urllib.parse.quote_plus(q) for q in query_terms])
-    for page in range(0, pages):
-        start = page * 25
-        url = f"https://www.linkedin.com/jobs/search?keywords={q}&location=India&start={start}"
+# -------------------------
+# HUB CRAWLER
+# Hub sources (kind="hub") are crawled breadth-first from their url:
+# career-looking links are followed on the seed's own site only, each
+# canonical URL is fetched once, and max_depth / max_pages bound the crawl.
+# Every level of the frontier is fetched concurrently.
+# -------------------------
+HUB_STATS = {}  # hub source name -> {"pages", "candidates"}, reported by stream_jobs
+
+def site_domain(url):
+    host = (urllib.parse.urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+class HubCrawl:
+    """Frontier, visited set and budgets of one hub crawl."""
+
+    def __init__(self, source):
+        self.source = source
+        self.domain = site_domain(source["url"])
+        self.frontier = deque([(source["url"], 0)])
+        self.visited = {canonical_link(source["url"])}
+        self.pages = 0
+        self.candidates = 0
+
+    def same_site(self, url):
+        domain = site_domain(url)
+        return domain == self.domain or domain.endswith("." + self.domain)
+
+    def next_batch(self, size):
+        """Pop up to `size` (url, depth) pairs, never exceeding max_pages in total."""
+        size = min(size, self.source["max_pages"] - self.pages, len(self.frontier))
+        batch = [self.frontier.popleft() for _ in range(max(0, size))]
+        self.pages += len(batch)
+        return batch
+
+    def add(self, url, depth, page):
+        """Record the fetched page of `url`: emit its jobs (not the seed's) and queue new links."""
+        page = page or {"jobs": [], "links": []}
+        if depth > 0:
+            self.candidates += len(page["jobs"])
+            emit_page(self.source, page["jobs"], url)
+        if depth >= self.source["max_depth"]:
+            return
+        for link in page["links"]:
+            key = canonical_link(link)
+            if key not in self.visited and self.same_site(link):
+                self.visited.add(key)
+                self.frontier.append((link, depth + 1))
+
+    def finish(self):
+        with _stats_lock:
+            HUB_STATS[self.source["name"]] = {"pages": self.pages, "candidates": self.candidates}
+
+def crawl_hub(source):
+    hub = HubCrawl(source)
+    while True:
+        batch = hub.next_batch(_page_workers)
+        if not batch:
+            hub.finish()
+            return
+        pages = run_parallel(lambda item: fetch_source_page(source, item[0], parse_hub_page, "hub"), batch)
+        for (url, depth), page in zip(batch, pages):
+            hub.add(url, depth, page)
+
+# -------------------------
+# ASYNC CRAWL MODE (plain-HTTP sources)
+# With SCRAPER_ASYNC=1 the "http" tier sources are fetched from one event loop over
+# a single aiohttp connection pool. Every host gets its own concurrency cap
+# and token bucket, so total time tracks the slowest host rather than the
+# sum of all pages. Pages that need JavaScript still fall back to Chrome.
+# -------------------------
+ASYNC_CRAWL = os.getenv("SCRAPER_ASYNC", "0") == "1"
+HOST_CONCURRENCY = max(1, int(os.getenv("SCRAPER_HOST_CONCURRENCY", "4")))
+HOST_RATE = float(os.getenv("SCRAPER_HOST_RATE", "2"))  # requests per second, per host
+ASYNC_MAX_CONNECTIONS = max(1, int(os.getenv("SCRAPER_MAX_CONNECTIONS", "32")))
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def take(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AsyncCrawler:
+    """Shared aiohttp session plus per-host semaphores and rate limits."""
+
+    def __init__(self, per_host=HOST_CONCURRENCY, rate=HOST_RATE, max_connections=ASYNC_MAX_CONNECTIONS):
+        self.per_host = per_host
+        self.rate = rate
+        self.max_connections = max_connections
+        self.session = None
+        self._hosts = {}
+        self.host_stats = {}
+
+    async def __aenter__(self):
+        import aiohttp  # only needed in async mode
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host,
+                                         ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS,
+                                             timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def _limits(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = (asyncio.Semaphore(self.per_host), TokenBucket(self.rate, self.per_host))
+            self.host_stats[host] = {"pages": 0, "seconds": 0.0}
+        return self._hosts[host]
+
+    async def fetch(self, url, ttl=None):
+        """
+        GET url under its host's limits, through the response cache. Returns
+        a cache entry (body, content_hash, ...); raises PageLoadError like
+        http_fetch().
+        """
+        if REPLAY:
+            return replay_entry(url)
+        entry = response_cache.get(url)
+        if response_cache.is_fresh(entry, CACHE_TTL if ttl is None else ttl):
+            count_fetch("cache_fresh")
+            return entry
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        sem, bucket = self._limits(host)
+        async with sem:
+            await bucket.take()
+            started = time.perf_counter()
+            counts = Counter(http_pages=1)
+            try:
+                async with self.session.get(url, headers=response_cache.conditional_headers(entry)) as resp:
+                    if resp.status == 304 and entry:
+                        count_fetch("cache_revalidated")
+                        return response_cache.revalidated(url, entry)
+                    if resp.status != 200 or "html" not in resp.headers.get("Content-Type", "html"):
+                        counts["errors"] += 1
+                        raise PageLoadError(f"HTTP {resp.status} ({resp.headers.get('Content-Type', '')})")
+                    body = await resp.text(errors="replace")
+                    counts["bytes"] += len(body)
+                    return response_cache.store(url, body, resp.headers)
+            except PageLoadError:
+                raise
+            except Exception as e:
+                counts["errors"] += 1
+                raise PageLoadError(f"async fetch failed: {e}") from e
+            finally:
+                elapsed = time.perf_counter() - started
+                stats = self.host_stats[host]
+                stats["pages"] += 1
+                stats["seconds"] += elapsed
+                run_metrics.observe("fetch", elapsed, **counts)
+
+    async def fetch_rows(self, url, parse, rows_selector=None, parse_key=None, max_wait=None, ttl=None,
+                         strain=None, breaker=None):
+        """Async counterpart of fetch_rows(); the Chrome fallback runs on a worker thread."""
+        parse_key = parse_key or parse.__name__
+        entry = await self.fetch(url, ttl)
+        if entry:
+            record_page(url, "http", entry["body"])
+            rows = rows_from_entry(url, entry, parse, rows_selector, parse_key, strain)
+            if rows is not None:
+                return rows
+        count_fetch("browser")
+        loop = asyncio.get_running_loop()
+        soup = await loop.run_in_executor(None, run_task, safe_get, url, rows_selector, max_wait, 0, strain,
+                                          breaker)
+        if soup is None:
+            raise PageLoadError("page did not load")
+        with run_metrics.stage("parse"):
+            return extract_rows(soup, url, parse)
+
+    async def fetch_source_page(self, source, url, parse=None, step="rows"):
+        """Async counterpart of fetch_source_page()."""
+        breaker = breaker_for(source)
+        if not breaker.allow():
+            return []
+        note_page_source(source, url)
+        parse = parse or source["parse"]
         try:
-            driver.get(url)
-            time.sleep(2.0)
-            scroll_page(pause=0.7, scrolls=6)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            cards = soup.select(".result-card__contents, .jobs-search-results__list-item, .base-search-card__info")
-            for c in cards:
-                title_el = c.select_one("h3, .base-search-card__title")
-                comp_el = c.select_one("h4, .base-search-card__subtitle")
-                link_el = c.find("a", href=True)
-                title = title_el.get_text(strip=True) if title_el else c.get_text(strip=True)[:120]
-                company = comp_el.get_text(strip=True) if comp_el else ""
-                link = link_el["href"] if link_el and link_el.has_attr("href") else ""
-                if link and not link.startswith("http"):
-                    link = urllib.parse.urljoin(url, link)
-                if looks_relevant(title, company):
-                    jobs.append({"title": title, "company": company or "LinkedIn", "link": link})
+            rows = await self.fetch_rows(url, functools.partial(parse, source=source), source["rows"],
+                                         parse_key(source, step), max_wait=source["wait_limit"],
+                                         ttl=source["cache_ttl"], strain=source["strain"], breaker=breaker)
+        except CircuitOpen:
+            return []
         except Exception as e:
-            print(f"⚠️ LinkedIn fetch error (may be blocked): {e}")
-            break
-    return jobs
+            print(f"⚠️ {source['name']} fetch error on {url}: {e}")
+            breaker.failed(url, e)
+            return []
+        breaker.succeeded()
+        return rows
+
+    async def crawl_paginated(self, urls, fetch_page, on_page):
+        """paginate() on the event loop: windows of `per_host` pages, same stop rules and result."""
+        early = _seen_keys is not None
+        kept, previous = 0, None
+        for start in range(0, len(urls), self.per_host):
+            window = urls[start:start + self.per_host]
+            for url, page_jobs in zip(window, await asyncio.gather(*(fetch_page(u) for u in window))):
+                stop = page_stop(page_jobs, previous, early)
+                if stop not in ("empty", "repeat"):
+                    on_page(kept, page_jobs, url)
+                    kept, previous = kept + 1, page_jobs
+                if stop:
+                    count_fetch("pages_skipped", max(0, len(urls) - start - self.per_host))
+                    return kept, stop
+        return kept, "budget"
+
+async def crawl_source(crawler, source):
+    """Async counterpart of run_source()."""
+    if source["kind"] == "hub":
+        hub = HubCrawl(source)
+        while True:
+            batch = hub.next_batch(crawler.per_host)
+            if not batch:
+                hub.finish()
+                return
+            pages = await asyncio.gather(*(crawler.fetch_source_page(source, url, parse_hub_page, "hub")
+                                           for url, _ in batch))
+            for (url, depth), page in zip(batch, pages):
+                hub.add(url, depth, page)
+    limit = asyncio.Semaphore(source["query_concurrency"])
+
+    async def search_pages(search):
+        label = search["label"]
+        urls = source_urls(source, _page_budgets.get(paging_key(source["name"], label)), search["terms"],
+                           search["location"])
+        async with limit:
+            pages, stop = await crawler.crawl_paginated(urls, lambda url: crawler.fetch_source_page(source, url),
+                                                        lambda i, page_jobs, url: emit_page(source, page_jobs, url, i, label))
+        finish_paging(source, urls, pages, stop, label)
+
+    await asyncio.gather(*(search_pages(search) for search in source_queries(source, FAN_OUT)))
+
+def crawl_async(sources):
+    """Run the given registry sources on one event loop; a failing source is reported and skipped."""
+    async def crawl_all():
+        async with AsyncCrawler() as crawler:
+            results = await asyncio.gather(*(crawl_source(crawler, src) for src in sources),
+                                           return_exceptions=True)
+        for host, stats in sorted(crawler.host_stats.items()):
+            print(f"   ↳ {host}: {stats['pages']} page(s), {stats['seconds']:.1f}s in requests")
+        return results
+
+    for src, res in zip(sources, asyncio.run(crawl_all())):
+        if isinstance(res, Exception):
+            print(f"⚠️ {src['name']} fetch failed: {res}")
 
 # -------------------------
-# MASTER FETCH (All sources)
+# DETAIL ENRICHMENT
+# With SCRAPER_ENRICH=1 the detail pages of the shortlisted jobs are read
+# (details.py) for their experience range, location, posted date and
+# skills. Pages are fetched over HTTP by SCRAPER_ENRICH_WORKERS threads, at
+# most SCRAPER_ENRICH_MAX_PAGES per run and within SCRAPER_ENRICH_BUDGET
+# seconds. What was read is stored per canonical link (job_store.py), so a
+# page is fetched once in its lifetime and a daily run only pays for the
+# jobs it hasn't read yet. Jobs asking for more than MAX_EXPERIENCE_YEARS
+# are dropped, the check HIGH_EXPERIENCE_RE can only make on titles.
 # -------------------------
-def fetch_all_jobs():
-    all_jobs = []
-    print("🌀 Starting multi-source scraping...")
+ENRICH = os.getenv("SCRAPER_ENRICH", "0") == "1"
+ENRICH_WORKERS = max(1, int(os.getenv("SCRAPER_ENRICH_WORKERS", "8")))
+ENRICH_MAX_PAGES = int(os.getenv("SCRAPER_ENRICH_MAX_PAGES", "60"))
+ENRICH_BUDGET = float(os.getenv("SCRAPER_ENRICH_BUDGET", "60"))
+MAX_EXPERIENCE_YEARS = 2
+
+def read_detail_page(url, deadline):
+    """("read", details), ("failed", None), or ("skipped", None) once `deadline` has passed."""
+    import requests
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return "skipped", None
+    final_url = url
+    if REPLAY:
+        body = fixture_store.page(url)
+    else:
+        with run_metrics.stage("fetch", detail_pages=1) as counts:
+            try:
+                resp = http_session().get(url, timeout=min(HTTP_TIMEOUT, remaining))
+            except requests.RequestException:
+                counts["errors"] += 1
+                return "failed", None
+            counts["bytes"] += len(resp.content)
+            ok = resp.status_code == 200 and "html" in resp.headers.get("Content-Type", "html")
+            body = resp.text if ok else None
+            final_url = resp.url
+    if body is None:
+        return "failed", None
+    with run_metrics.stage("parse", detail_pages=1):
+        soup = make_soup(body)
+        try:
+            details = parse_details(soup)
+        finally:
+            soup.decompose()
+    # job pages often carry a reCAPTCHA'd apply form, so a page is only
+    # taken for a captcha / login wall when nothing could be read from it
+    if not any(details.values()) and detect_block(body, final_url):
+        return "failed", None
+    record_page(url, "http", body, source="details")
+    return "read", details
+
+class DetailEnricher:
+    """
+    Detail-page enrichment for one run: enrich() can be called on
+    successive chunks of jobs, which share the run's time budget (counted
+    from the first call) and page limit.
+    """
 
-    # Kerala parks
-    all_jobs += fetch_infopark_jobs(pages=6)
-    all_jobs += fetch_technopark_jobs(pages=6)
-    all_jobs += fetch_cyberpark_jobs()
-    all_jobs += fetch_smartcity_jobs()
+    def __init__(self, budget=None, max_pages=None):
+        self.budget = ENRICH_BUDGET if budget is None else budget
+        self.pages_left = ENRICH_MAX_PAGES if max_pages is None else max_pages
+        self.deadline = None
+        self.stats = Counter()
+
+    def fetch(self, links):
+        """Read the detail pages of `links` concurrently; returns {link: details} of the pages read."""
+        allowed = links[:max(0, self.pages_left)]
+        self.stats["over_limit"] += len(links) - len(allowed)
+        links = allowed
+        if not links:
+            return {}
+        self.pages_left -= len(links)
+        if self.deadline is None:
+            self.deadline = time.monotonic() + self.budget
+        remaining = max(0.0, self.deadline - time.monotonic())
+        read, failed = {}, []
+        ex = ThreadPoolExecutor(max_workers=min(ENRICH_WORKERS, len(links)), thread_name_prefix="detail")
+        futures = {ex.submit(read_detail_page, link, self.deadline): link for link in links}
+        try:
+            for f in as_completed(futures, timeout=remaining):
+                outcome, page = f.result()
+                if outcome == "read":
+                    read[futures[f]] = page
+                elif outcome == "failed":
+                    failed.append(futures[f])
+        except FuturesTimeout:
+            pass  # pages still in flight (HTTP retries) are left for the next run
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)
+        self.stats["read"] += len(read)
+        self.stats["failed"] += len(failed)
+        self.stats["skipped"] += len(links) - len(read) - len(failed)
+        save_details(read, failed)
+        return read
+
+    def enrich(self, jobs, shared=()):
+        """
+        Add the detail-page fields (details.parse_details) to every job
+        whose page has been read, reading unread pages first. Returns the
+        jobs that don't ask for more than MAX_EXPERIENCE_YEARS. A link in
+        `shared` (held by several records) or pointing back at the page the
+        job was listed on is no detail page of that one job, and is left alone.
+        """
+        links = []
+        for job in jobs:
+            link = job.get("link", "")
+            if not link.startswith("http"):
+                continue
+            if link in shared or link == canonical_link(job.get("page_url") or ""):
+                self.stats["not_detail"] += 1
+            else:
+                links.append(link)
+        links = list(dict.fromkeys(links))
+        details, done = load_details(links)
+        self.stats["cached"] += len(details)
+        todo = [link for link in links if link not in done]
+        details.update(self.fetch(todo))
+        kept = []
+        for job in jobs:
+            job.update(details.get(job.get("link"), {}))
+            if (job.get("experience_min") or 0) <= MAX_EXPERIENCE_YEARS:
+                kept.append(job)
+        self.stats["dropped"] += len(jobs) - len(kept)
+        return kept
+
+    def report(self):
+        st = self.stats
+        print(f"🔬 Detail pages: {st['cached']} cached, {st['read']} read, {st['failed']} failed, "
+              f"{st['skipped'] + st['over_limit']} left for the next run by the time budget / page limit; "
+              f"dropped {st['dropped']} asking for {MAX_EXPERIENCE_YEARS + 1}+ years; "
+              f"{st['not_detail']} jobs without a page of their own")
 
-    # Major hubs
-    all_jobs += fetch_tidelpark_jobs()
-    all_jobs += fetch_stpi_jobs()
+# -------------------------
+# STREAMING PIPELINE (All sources)
+# Scrapers hand every parsed page to emit_page(); the pages flow through a
+# bounded queue (SCRAPER_STREAM_BUFFER pages, so scrapers wait when the
+# stages fall behind) into generator stages: classify (against the
+# seen-jobs snapshot taken before the run), normalize, merge duplicates,
+# enrich, keep only new jobs. Raw pages are never held for the whole run;
+# SeenSink keeps only the fields the seen-jobs store needs. The relevant candidates are
+# held until scraping ends and then merged in job_order(), so which jobs
+# group together doesn't depend on which thread finished first. Sinks
+# (jobs.csv, the email) consume the merged jobs as they come out.
+# -------------------------
+STREAM_BUFFER = max(1, int(os.getenv("SCRAPER_STREAM_BUFFER", "32")))
+ENRICH_CHUNK = ENRICH_WORKERS * 4  # jobs buffered per detail-page batch
+_page_stream = None  # queue of parsed pages while scrape_pages() runs
+_stream_closed = threading.Event()
 
-    # Bangalore—attempts using known resource pages (Manyata/ITPB/Ecospace may not host centralized job lists)
-    bgl_urls = [
-        # Replace/extend with actual hub pages you want to target
-        "https://manyata.com",      # placeholder/fallback
-        "https://itpbengaluru.org", # placeholder
-        "https://www.embassymanyata.com"  # placeholder
-    ]
-    for u in bgl_urls:
+def emit_page(source, page_jobs, url, page=None, search=""):
+    """
+    Hand one page of raw candidates from `source`, read from `url` (page
+    index `page`, for paginated sources, of the fanned-out `search`), to
+    the running pipeline. Blocks while the buffer is full; outside a pipeline it does
+    nothing.
+    """
+    stream = _page_stream
+    if stream is None or not page_jobs:
+        return
+    tag = {"source": source["name"], "page_url": url}
+    if page is not None:
+        tag["page"] = page
+    if search:
+        tag["search"] = search
+    jobs = [{**j, **tag, "position": i} for i, j in enumerate(page_jobs)]
+    while not _stream_closed.is_set():
         try:
-            all_jobs += fetch_bengaluru_generic(u)
-        except Exception as e:
-            print(f"⚠️ Bangalore generic fetch failed for {u}: {e}")
+            stream.put(jobs, timeout=0.5)
+            return
+        except queue.Full:
+            pass
 
-    # Big job portals (search-based)
-    all_jobs += fetch_indeed_jobs(query_terms=["python", "data analyst", "data scientist", "machine learning", "react"], pages=4)
-    all_jobs += fetch_naukri_jobs(query_terms=["python", "data analyst", "data scientist", "machine learning", "react"], pages=3)
-    # LinkedIn best-effort
-    all_jobs += fetch_linkedin_jobs(query_terms=["python", "data analyst", "data scientist", "machine learning", "react"], pages=1)
+def scrape_pages(sources, pool_size, use_async):
+    """
+    Scrape `sources` with at most `pool_size` browsers ("http" tier sources
+    on the event loop with `use_async`) and yield their pages, lists of raw
+    candidates, in the order they are parsed.
+    """
+    global driver_pool, _page_executor, _page_workers, _page_stream
+    async_sources = [src for src in sources if use_async and src["tier"] == "http"]
+    thread_sources = [src for src in sources if src not in async_sources]
+    driver_pool = DriverPool(pool_size)
+    _page_stream = queue.Queue(maxsize=STREAM_BUFFER)
+    _stream_closed.clear()
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="page") as page_executor, \
+             ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="source") as source_executor:
+            _page_executor, _page_workers = page_executor, pool_size
+            try:
+                futures = {source_executor.submit(run_task, run_source, src): src["name"] for src in thread_sources}
+                if async_sources:
+                    futures[source_executor.submit(crawl_async, async_sources)] = "async crawl"
+                while True:
+                    try:
+                        yield _page_stream.get(timeout=0.2)
+                    except queue.Empty:
+                        if all(f.done() for f in futures) and _page_stream.empty():
+                            break
+                for f, name in futures.items():
+                    if f.exception():
+                        print(f"⚠️ {name} fetch failed: {f.exception()}")
+            finally:
+                _stream_closed.set()  # unblocks scrapers if the consumer stopped early
+                _page_executor, _page_workers = None, 1
+    finally:
+        _page_stream = None
+        driver_pool.close()
+        close_http_session()
+        response_cache.prune()
+
+class RunTally:
+    """Counts gathered by the pipeline stages for the end-of-run report."""
+
+    def __init__(self):
+        self.candidates = 0
+        self.rejected = Counter()
+        self.relevant = Counter()       # source name -> relevant candidates
+        self.page_counts = {}           # (paging key, page) -> [candidates, relevant]
+        self.searches = {}              # paging key of a fanned-out search -> Counter of candidates/relevant/unique/new
+        self.new_fingerprints = set()   # not in the seen-jobs snapshot taken before this run
+        self.merged = {"link": 0, "exact": 0, "near": 0}
+        self.unique = 0
+        self.new = 0
+        self.first_job_at = None
+
+    def search(self, key):
+        return self.searches.setdefault(key, Counter())
+
+def classify_stage(pages, tally, known, seen):
+    """
+    Classify every page, note the candidates the `known` snapshot (SeenKeys
+    from before the run) lacks as new, hand the page to the `seen` sink
+    and yield its relevant candidates.
+    """
+    for page_jobs in pages:
+        with run_metrics.stage("filter", candidates=len(page_jobs)) as counts:
+            mask, reasons = classify_jobs(page_jobs)
+            counts["accepted"] += int(mask.sum())
+            counts["rejected"] += len(page_jobs) - int(mask.sum())
+        tally.candidates += len(page_jobs)
+        tally.rejected.update(r for r, keep in zip(reasons, mask) if not keep)
+        tally.new_fingerprints.update(job_fingerprint(j) for j in page_jobs
+                                      if j.get("title") and not is_known(j, known))
+        seen.add_page(page_jobs, mask)
+        for c, keep in zip(page_jobs, mask):
+            key = paging_key(c["source"], c.get("search", ""))
+            if "page" in c:
+                per_page = tally.page_counts.setdefault((key, c["page"]), [0, 0])
+                per_page[0] += 1
+                per_page[1] += int(keep)
+            if c.get("search"):
+                tally.search(key).update(candidates=1, relevant=int(keep))
+            if keep:
+                tally.relevant[c["source"]] += 1
+                yield c
+
+def dedupe_stage(jobs, tally):
+    """
+    Merge every relevant candidate once scraping is done, in job_order(),
+    and yield the merged records in that order.
+    """
+    deduper = StreamDeduper()
+    tally.merged = deduper.stats
+    pending = sorted(jobs, key=job_order)
+    with run_metrics.stage("dedupe", jobs=len(pending)) as counts:
+        records = [record for record in map(deduper.add, pending) if record is not None]
+        counts["merged"] += len(pending) - len(records)
+    yield from records
+
+def enrich_stage(jobs, enricher):
+    """
+    enricher.enrich() over chunks of ENRICH_CHUNK jobs. A link shared by
+    several merged records (a careers page, a listing) isn't enriched.
+    """
+    jobs = list(jobs)
+    links = Counter(job.get("link") for job in jobs)
+    shared = {link for link, n in links.items() if n > 1}
+
+    def enrich(chunk):
+        with run_metrics.stage("enrich", jobs=len(chunk)) as counts:
+            kept = enricher.enrich(chunk, shared)
+            counts["dropped"] += len(chunk) - len(kept)
+        return kept
+
+    chunk = []
+    for job in jobs:
+        chunk.append(job)
+        if len(chunk) >= ENRICH_CHUNK:
+            yield from enrich(chunk)
+            chunk = []
+    if chunk:
+        yield from enrich(chunk)
+
+def delta_stage(jobs, tally, delta_only):
+    """Count new jobs; with `delta_only` yield only those."""
+    for job in jobs:
+        new = job_fingerprint(job) in tally.new_fingerprints
+        job["new"] = new  # first seen by this run; ranks as fresh when no posted date is known
+        tally.unique += 1
+        tally.new += new
+        if job.get("search"):
+            tally.search(paging_key(job["source"], job["search"])).update(unique=1, new=int(new))
+        if new or not delta_only:
+            yield job
+
+def print_search_stats(searches):
+    """Yield of every fanned-out search; unique counts the merged jobs it found first."""
+    for key, st in sorted(searches.items()):
+        print(f"   🔤 {key}: {st['candidates']} candidate(s), {st['relevant']} relevant, "
+              f"{st['unique']} unique ({st['new']} new)")
+
+def print_hub_stats(relevant):
+    """Pages fetched vs jobs found per hub seed, so seeds that never yield can be dropped."""
+    for name, st in sorted(HUB_STATS.items()):
+        hint = " — never yields, consider dropping this seed" if not relevant[name] else ""
+        print(f"   🕸️ {name}: {st['pages']} page(s) fetched, {st['candidates']} candidate(s), "
+              f"{relevant[name]} relevant{hint}")
+
+def history_stage(jobs, history):
+    """Hand every job to the `history` sink and pass it on."""
+    for job in jobs:
+        history.add(job)
+        yield job
+
+def stream_jobs(pool_size=None, use_async=None, delta_only=None, enrich=None, history=None, seen=None):
+    """
+    Scrape every source with at most `pool_size` browsers (default
+    SCRAPER_POOL_SIZE) and yield the relevant, merged jobs in job_order()
+    once every source is done. With `use_async` (default SCRAPER_ASYNC) the park "http" tier
+    sources are crawled on an event loop while the browser tier uses the
+    threads. With `delta_only` (default SCRAPER_DELTA_ONLY) only jobs no
+    earlier run has seen are yielded. With `enrich` (default SCRAPER_ENRICH)
+    the jobs are completed from their detail pages first. A `history` sink
+    (JobStoreSink) gets every job ahead of the delta filter, so jobs that
+    earlier runs found are still recorded as seen again. It is closed with
+    the stream. New means missing from the seen-jobs store as it was before
+    the run; every candidate goes to the `seen` sink (SeenSink), which
+    records them there when the caller closes it. Without one, they are
+    recorded once the stream completes. The run report is printed once the
+    stream is exhausted.
+    """
+    global _seen_keys, _page_budgets, run_metrics
+    pool_size = max(1, pool_size or SCRAPER_POOL_SIZE)
+    use_async = ASYNC_CRAWL if use_async is None else use_async
+    delta_only = DELTA_ONLY if delta_only is None else delta_only
+    enrich = ENRICH if enrich is None else enrich
+    known = load_seen_keys()
+    _seen_keys = known if EARLY_STOP and known else None
+    health = load_source_health()
+    sources, skipped = open_sources([src for src in SOURCES if src["enabled"]], health)
+    page_history = load_page_history(PAGE_HISTORY_RUNS)
+    _page_budgets = {}
+    for src in filter(is_paginated, sources):
+        for search in source_queries(src, FAN_OUT):
+            key = paging_key(src["name"], search["label"])
+            _page_budgets[key] = page_budget(src, page_history.get(key))
+    n_async = sum(1 for src in sources if use_async and src["tier"] == "http")
+    mode = f", {n_async} async" if n_async else ""
+    mode += f", {len(skipped)} skipped by open circuits" if skipped else ""
+    print(f"🌀 Starting multi-source scraping ({len(sources)} sources{mode}, {pool_size} browser(s))...")
+    started = time.perf_counter()
+
+    FETCH_STATS.clear()
+    WAIT_STATS.clear()
+    HUB_STATS.clear()
+    NETWORK_STATS.clear()
+    _breakers.clear()
+    PAGING_STATS.clear()
+    run_metrics = RunMetrics()
+    tally = RunTally()
+    enricher = DetailEnricher() if enrich else None
+    own_seen = seen is None
+    seen = SeenSink() if own_seen else seen
+    completed = False
+    try:
+        jobs = classify_stage(scrape_pages(sources, pool_size, use_async), tally, known, seen)
+        jobs = dedupe_stage((normalize_job(j) for j in jobs), tally)
+        if enricher:
+            jobs = enrich_stage(jobs, enricher)
+        if history is not None:
+            jobs = history_stage(jobs, history)
+        for job in delta_stage(jobs, tally, delta_only):
+            if tally.first_job_at is None:
+                tally.first_job_at = time.perf_counter() - started
+            yield job
+        completed = True
+    finally:
+        if history is not None:
+            history.close(completed)
+        if own_seen:
+            seen.close(completed)
+        _seen_keys = None
+        _page_budgets = {}
+        save_source_health(update_health(health))
+
+    relevant = sum(tally.relevant.values())
+    print(f"🔎 Candidates: {tally.candidates}, relevant: {relevant}, rejected: {dict(tally.rejected)}")
+    print_search_stats(tally.searches)
+    print_hub_stats(tally.relevant)
+    print_paging_stats(record_paging(tally.page_counts), page_history)
+    merged = tally.merged
+    print(f"🧬 Duplicates merged: {sum(merged.values())} ({merged['link']} same link, "
+          f"{merged['exact']} identical after normalization, {merged['near']} near-identical)")
+    if enricher:
+        enricher.report()
+    print(f"🆕 New since last run: {tally.new} of {tally.unique} "
+          f"(pages skipped by early stop: {FETCH_STATS['pages_skipped']})")
+    print(f"🌐 Pages over HTTP: {FETCH_STATS['http']}, via browser: {FETCH_STATS['browser']} "
+          f"(HTTP had no rows: {FETCH_STATS['http_no_rows']})")
+    print(f"🗄️ Cache: {FETCH_STATS['cache_fresh']} fresh, {FETCH_STATS['cache_revalidated']} revalidated (304), "
+          f"{FETCH_STATS['parse_skipped']} page(s) not re-parsed")
+    if REPLAY or RECORD:
+        print(f"📼 Fixtures ({fixture_store.directory}): {FETCH_STATS['replayed']} page(s) replayed, "
+              f"{FETCH_STATS['replay_missing']} not recorded, {FETCH_STATS['recorded']} recorded")
+    print_wait_stats()
+    print_network_stats()
+    print_breaker_stats(skipped, health)
+    first = f", first after {tally.first_job_at:.1f}s" if tally.first_job_at is not None else ""
+    print(f"✅ Scraping complete — unique jobs found: {tally.unique if not delta_only else tally.new} "
+          f"in {time.perf_counter() - started:.1f}s{first}")
+    run_metrics.run.update({
+        "sources": len(sources), "sources_skipped": len(skipped),
+        "candidates": tally.candidates, "relevant": relevant, "rejected": sum(tally.rejected.values()),
+        "merged": sum(merged.values()), "unique": tally.unique, "new": tally.new,
+        "scrape_seconds": round(time.perf_counter() - started, 3),
+        "first_job_seconds": round(tally.first_job_at, 3) if tally.first_job_at is not None else None,
+        "rejected_by_reason": dict(tally.rejected), "relevant_by_source": dict(tally.relevant),
+        "merged_by_kind": dict(merged), "fetch": dict(FETCH_STATS), "paging": dict(PAGING_STATS),
+        "searches": {key: dict(st) for key, st in tally.searches.items()},
+        "breakers": {name: b.reason for name, b in _breakers.items() if b.tripped},
+    })
+
+def fetch_all_jobs(pool_size=None, use_async=None, delta_only=None, enrich=None):
+    """stream_jobs() collected into a list."""
+    return list(stream_jobs(pool_size, use_async, delta_only, enrich))
+
+# -------------------------
+# RANKING
+# Every emailed job gets a score, computed for the whole batch in one
+# pandas pass: prefer-term hits (fresher, intern, ...), include-term hits
+# (the stack we place), the trust of the sources that listed it
+# ("trust" in sources.py) and recency. Recency halves every
+# RECENCY_HALF_LIFE days of the job's age, taken from the posted date
+# enrichment read, else 0 for a job first seen by this run and one
+# half-life for an older one. Emails carry the EMAIL_TOP_N best jobs,
+# best first.
+# -------------------------
+SCORE_WEIGHTS = {"prefer": 3.0, "include": 2.0, "trust": 1.5, "recency": 2.0}
+PREFER_HITS_CAP = 2   # prefer / include hits beyond these add nothing
+INCLUDE_HITS_CAP = 4
+RECENCY_HALF_LIFE = 7.0  # days
+EMAIL_TOP_N = int(os.getenv("SCRAPER_EMAIL_TOP_N", "50"))  # 0 emails every job
+_POSTED_AGO = r"(?P<n>\d+)\+?\s*(?P<unit>hour|day|week|month)s?\s+ago"
+_UNIT_DAYS = {"hour": 0.0, "day": 1.0, "week": 7.0, "month": 30.0}
+
+def posted_age_days(posted, now=None):
+    """Age in days of every `posted` string (pandas Series; NaN where it can't be read)."""
+    import pandas as pd
+    posted = posted.fillna("").astype(str).str.strip().str.lower()
+    ago = posted.str.extract(_POSTED_AGO)
+    age = pd.to_numeric(ago["n"], errors="coerce") * ago["unit"].map(_UNIT_DAYS)
+    age[posted.isin(["today", "just now"])] = 0.0
+    now = pd.Timestamp(now or datetime.now())
+    iso = age.isna() & posted.str.match(r"\d{4}-\d{2}-\d{2}")  # JSON-LD datePosted
+    if iso.any():
+        when = pd.to_datetime(posted[iso].str[:10], errors="coerce", format="ISO8601")
+        age[iso] = (now - when).dt.total_seconds() / 86400
+    dated = age.isna() & ~iso & (posted != "")  # written dates ("12/10/2026") are Indian, day first
+    if dated.any():
+        when = pd.to_datetime(posted[dated], errors="coerce", format="mixed", dayfirst=True)
+        age[dated] = (now - when).dt.total_seconds() / 86400
+    return age.astype(float).clip(lower=0)
+
+def score_jobs(jobs):
+    """Scores (numpy array, higher is better) of `jobs`, in their order."""
+    import numpy as np
+    import pandas as pd
+    if not jobs:
+        return np.zeros(0)
+    m = get_matcher()
+    df = pd.DataFrame.from_records(jobs, columns=["title", "company", "posted", "new"])
+    text = (df["title"].fillna("") + " " + df["company"].fillna("")).str.lower()
+    prefer = text.str.count(m.prefer_re).clip(upper=PREFER_HITS_CAP) / PREFER_HITS_CAP
+    include = text.str.count(m.include_re).clip(upper=INCLUDE_HITS_CAP) / INCLUDE_HITS_CAP
+    trust_by_name = {src["name"]: src["trust"] for src in SOURCES}
+    trust = np.array([max(trust_by_name.get(name, 1.0) for name in job.get("sources") or [job.get("source")])
+                      for job in jobs])
+    age = posted_age_days(df["posted"])
+    fallback = np.where(df["new"].fillna(False).astype(bool), 0.0, RECENCY_HALF_LIFE)
+    recency = 0.5 ** (age.fillna(pd.Series(fallback, index=age.index)) / RECENCY_HALF_LIFE)
+    w = SCORE_WEIGHTS
+    score = w["prefer"] * prefer + w["include"] * include + w["trust"] * trust + w["recency"] * recency
+    return score.round(3).to_numpy()
+
+def rank_jobs(jobs, top_n=None):
+    """
+    The `top_n` (default EMAIL_TOP_N; 0 = all) best of `jobs`, best first,
+    each with its "score". Equal scores go in job_order().
+    """
+    top_n = EMAIL_TOP_N if top_n is None else top_n
+    with run_metrics.stage("rank", jobs=len(jobs)):
+        scores = score_jobs(jobs)
+        order = sorted(range(len(jobs)), key=lambda i: (-scores[i], job_order(jobs[i])))
+        if top_n:
+            order = order[:top_n]
+        return [dict(jobs[i], score=float(scores[i])) for i in order]
 
-    # Normalize and dedupe
-    all_jobs = [normalize_job(j) for j in all_jobs if j.get("title")]
-    all_jobs = dedupe_jobs(all_jobs)
-    print(f"✅ Scraping complete — unique jobs found: {len(all_jobs)}")
-    return all_jobs
+# -------------------------
+# STUDENT MATCHING
+# Students with a profile (skills / locations from the STUDENT_PROFILES
+# secret or users.db, students.py) get their own list: the ranked jobs go into one JobIndex per run, and
+# each profile is answered from its postings, best first. Recipients
+# without a profile get the common top EMAIL_TOP_N.
+# -------------------------
+def match_students(ranked, recipients, profiles=None):
+    """{recipient email: that student's jobs} for the `recipients` that have a profile."""
+    profiles = load_profiles() if profiles is None else profiles
+    wanted = {email: profiles[email.lower()] for email in recipients if email.lower() in profiles}
+    if not wanted:
+        return {}
+    with run_metrics.stage("match", jobs=len(ranked), students=len(wanted)):
+        index = JobIndex(ranked)
+        matched = {email: index.jobs_for(profile, EMAIL_TOP_N) for email, profile in wanted.items()}
+    total = sum(map(len, matched.values()))
+    print(f"🎯 {len(matched)} student profile(s) matched, {total / len(matched):.1f} job(s) each on average")
+    return matched
 
 # -------------------------
 # EMAIL (unchanged; preserve your original styling & env usage)
 # -------------------------
-def send_email(jobs):
+def job_facts_html(job):
+    """Location / experience / posted line of an enriched job ("" when nothing is known)."""
+    facts = []
+    if job.get("location"):
+        facts.append(f"📍 {job['location']}")
+    if job.get("experience_min") is not None:
+        high = job.get("experience_max")
+        facts.append(f"🧭 {job['experience_min']}{f'-{high}' if high is not None else '+'} yrs")
+    if job.get("posted"):
+        facts.append(f"🗓️ {job['posted']}")
+    return f'<p style="margin:6px 0; color:#555;">{" · ".join(facts)}</p>' if facts else ""
+
+def send_email(jobs, student_jobs=None):
+    """
+    Mail `jobs` to every EMAIL_TO recipient; one listed in `student_jobs`
+    (match_students) gets that list instead, and no email when it is empty.
+    """
     sender = os.getenv("EMAIL_USER")
     password = os.getenv("EMAIL_PASS")
     recipients = [x.strip() for x in os.getenv("EMAIL_TO", "").split(",") if x.strip()]
@@ -570,7 +2085,12 @@ def send_email(jobs):
         print(f"⚠️ Warning: STUDENT_NAMES count ({len(student_names)}) != EMAIL_TO count ({len(recipients)}). Proceeding by index.")
 
     for index, student_email in enumerate(recipients):
+        render_started = time.perf_counter()
         student_name = student_names[index] if index < len(student_names) else "Student"
+        their_jobs = (student_jobs or {}).get(student_email, jobs)
+        if not their_jobs:
+            print(f"⚠️ No jobs match the profile of {student_name} ({student_email}); no email sent")
+            continue
 
         html = f"""
         <html>
@@ -606,7 +2126,8 @@ def send_email(jobs):
         """
 
         # Add job cards
-        for job in jobs:
+        for job in their_jobs:
+            # job['link'] is canonical (links.py), so every click on a job is logged under one link
             safe_link = urllib.parse.quote(job['link'], safe='')
             safe_title = urllib.parse.quote(job['title'], safe='')
             safe_email = urllib.parse.quote(student_email, safe='')
@@ -616,6 +2137,7 @@ def send_email(jobs):
             <div style="border:1px solid #ddd; border-radius:10px; padding:15px; background:#ffffff; margin-bottom:12px;">
                 <h3 style="color:#5B00C2; margin:0;">{job['title']}</h3>
                 <p style="margin:6px 0;">🏢 {job['company']}</p>
+                {job_facts_html(job)}
                 <a href="{tracking_link}" style="display:inline-block; background:linear-gradient(90deg,#FF6B00,#5B00C2); color:white; padding:8px 14px; text-decoration:none; border-radius:6px; font-weight:bold;">🔗 View & Apply</a>
             </div>
             """
@@ -635,33 +2157,189 @@ def send_email(jobs):
         msg["To"] = student_email
         msg["Subject"] = subject
         msg.attach(MIMEText(html, "html"))
+        run_metrics.observe("render", time.perf_counter() - render_started, emails=1, jobs=len(their_jobs),
+                            bytes=len(html))
 
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
+        with run_metrics.stage("send", emails=1), smtplib.SMTP("smtp.gmail.com", 587) as server:
             server.starttls()
             server.login(sender, password)
             server.send_message(msg)
 
         print(f"✅ Email sent to {student_name} ({student_email})")
 
+# -------------------------
+# SINKS
+# Consumers of stream_jobs(): add() takes each job as it comes out of the
+# pipeline, close(completed) runs once the stream is exhausted, or with
+# completed=False when a stage raised, so a partial run is kept on disk but
+# never emailed. drain() closes its sinks in order and a sink after one
+# whose close() raised gets completed=False too, so SeenSink, listed last,
+# only marks jobs as seen once the email has gone out.
+# -------------------------
+CSV_FIELDS = ["title", "company", "link", "source", "location", "experience_min", "experience_max", "posted",
+              "skills"]
+
+class CsvSink:
+    """Writes jobs to `path` row by row; the file is only created once there is a job."""
+
+    def __init__(self, path="jobs.csv"):
+        self.path = path
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def add(self, job):
+        import csv
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self._writer.writeheader()
+        row = dict(job)
+        if isinstance(row.get("skills"), list):
+            row["skills"] = ", ".join(row["skills"])
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self, completed=True):
+        if self._file:
+            self._file.close()
+
+class EmailSink:
+    """
+    Collects the jobs; when the stream ends the best ones (rank_jobs) are
+    mailed by send_email(), per student where they have a profile.
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+    def add(self, job):
+        self.jobs.append(job)
+
+    def close(self, completed=True):
+        if not completed:
+            if self.jobs:
+                print(f"⚠️ Run failed; {len(self.jobs)} job(s) not emailed")
+            return
+        if self.jobs:
+            ranked = rank_jobs(self.jobs, top_n=0)
+            top = ranked[:EMAIL_TOP_N or None]
+            print(f"📬 Emailing the top {len(top)} of {len(ranked)} job(s) "
+                  f"(scores {top[-1]['score']:g}–{top[0]['score']:g})")
+            recipients = [x.strip() for x in os.getenv("EMAIL_TO", "").split(",") if x.strip()]
+            send_email(top, match_students(ranked, recipients))
+
+class JobStoreSink:
+    """
+    Keeps every job in the job history of job_store.py (SEEN_DB_PATH),
+    upserted `batch` at a time. With SCRAPER_PARQUET_DIR set, close() also
+    rewrites the Parquet partitions of the months holding a job of this run.
+    """
+
+    def __init__(self, batch=500, parquet_dir=None):
+        self.batch = batch
+        self.parquet_dir = os.getenv("SCRAPER_PARQUET_DIR", "") if parquet_dir is None else parquet_dir
+        self.rows = 0
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self._pending = []
+
+    def _flush(self):
+        if self._pending:
+            with run_metrics.stage("store", jobs=len(self._pending)):
+                self.rows += upsert_jobs(self._pending)
+            self._pending = []
+
+    def add(self, job):
+        self._pending.append(job)
+        if len(self._pending) >= self.batch:
+            self._flush()
+
+    def close(self, completed=True):
+        self._flush()
+        if not (self.parquet_dir and self.rows):
+            return
+        try:
+            with run_metrics.stage("export"):
+                written = export_jobs_parquet(self.parquet_dir, job_months(seen_since=self.started))
+            print(f"🗃️ Job history exported to {', '.join(written)}")
+        except ImportError as e:
+            print(f"⚠️ Parquet export skipped, needs pyarrow: {e}")
+
+class SeenSink:
+    """
+    Records a run's candidates in the seen-jobs store (record_seen), which
+    tells later runs which jobs are new. stream_jobs() hands it every
+    classified page; nothing is written unless close() is called with
+    completed=True, so a run whose email failed finds the same jobs new
+    when it is retried.
+    """
+    FIELDS = ("title", "company", "link", "source")
+
+    def __init__(self):
+        self.rows = 0
+        self._jobs = []
+        self._relevant = []
+
+    def add_page(self, page_jobs, relevant):
+        self._jobs.extend({k: j.get(k) for k in self.FIELDS} for j in page_jobs)
+        self._relevant.extend(bool(keep) for keep in relevant)
+
+    def add(self, job):
+        pass  # the candidates come from add_page(), merged jobs add nothing
+
+    def close(self, completed=True):
+        if not completed:
+            if self._jobs:
+                print(f"⚠️ Run failed; {len(self._jobs)} candidate(s) not recorded as seen")
+            return
+        if self._jobs:
+            with run_metrics.stage("record", jobs=len(self._jobs)):
+                record_seen(self._jobs, relevant=self._relevant)
+            self.rows = len(self._jobs)
+        self._jobs, self._relevant = [], []
+
+def drain(jobs, sinks):
+    """Feed every job of the stream to every sink, then close the sinks. Returns the job count."""
+    count, completed = 0, False
+    try:
+        for job in jobs:
+            count += 1
+            for sink in sinks:
+                sink.add(job)
+        completed = True
+    finally:
+        error = None
+        for sink in sinks:
+            try:
+                sink.close(completed and error is None)
+            except Exception as e:
+                error = error or e
+                print(f"⚠️ {type(sink).__name__} failed to close: {e}")
+        if error is not None and completed:
+            raise error
+    return count
+
 # -------------------------
 # MAIN
 # -------------------------
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
 if __name__ == "__main__":
+    print(f"⏱️ app imported in {IMPORT_SECONDS * 1000:.0f} ms")
+    # jobs.csv is written as jobs arrive (GitHub Actions runner artifact if you upload it);
+    # the email (keeps your original mail settings) goes out once the run is complete
+    # and every job, new or not, also lands in the history in seen_jobs.db (python job_store.py query --help);
+    # jobs only count as seen for later runs once the email went out
+    csv_sink, seen_sink = CsvSink("jobs.csv"), SeenSink()
     try:
-        jobs = fetch_all_jobs()
+        if drain(stream_jobs(history=JobStoreSink(), seen=seen_sink), [csv_sink, EmailSink(), seen_sink]):
+            print(f"✅ Found {csv_sink.rows} matching jobs. Saved to jobs.csv and the job history.")
+        else:
+            print("⚠️ No matching jobs found.")
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
-
-    if jobs:
-        # Save CSV for record (GitHub Actions runner artifact if you upload it)
-        df = pd.DataFrame(jobs)
-        df.drop_duplicates(subset=["title","company"], inplace=True)
-        df.to_csv("jobs.csv", index=False)
-        print(f"✅ Found {len(df)} matching jobs. Saved to jobs.csv.")
-        # Send email (keeps your original mail settings)
-        send_email(jobs)
-    else:
-        print("⚠️ No matching jobs found.")
\ No newline at end of file
+        # the report is written even when a stage (e.g. SMTP) failed, so the failure shows in it
+        run_metrics.run["import_seconds"] = round(IMPORT_SECONDS, 3)
+        run_metrics.print_summary()
+        written = run_metrics.write()
+        if written:
+            print(f"🧾 Run metrics written to {', '.join(written)}")
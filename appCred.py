@@ -1,41 +1,19 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 import requests
 from nacl import public
 import base64
+import hmac
 import json
 import os
-import sqlite3
 
+from students import init_students_db, profiles_json, save_student
 
 
 app = Flask(__name__)
 
 
-def init_students_db():
-    conn = sqlite3.connect("users.db")
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS students (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            email TEXT UNIQUE
-        )
-    """)
-    conn.commit()
-    conn.close()
-
 init_students_db()
 
-def save_student_to_db(name, email):
-    conn = sqlite3.connect("users.db")
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT OR IGNORE INTO students (name, email) VALUES (?, ?)",
-        (name, email)
-    )
-    conn.commit()
-    conn.close()
-
 
 
 # Load GitHub credentials
@@ -43,6 +21,9 @@ GITHUB_TOKEN = os.getenv("GITHUB_PAT")   # <-- FIXED
 REPO = os.getenv("GITHUB_REPO", "acadenocareers/Joblisting") 
 EMAIL_SECRET = "EMAIL_TO"
 NAMES_SECRET = "STUDENT_NAMES"
+# The scheduled run downloads every student's skills / locations from
+# /student-profiles (a roster of thousands outgrows a 48 KB Actions secret)
+PROFILES_TOKEN = os.getenv("PROFILES_TOKEN")
 
 def encrypt(public_key: str, secret_value: str) -> str:
     public_key_bytes = base64.b64decode(public_key)
@@ -84,11 +65,21 @@ def upsert_secret(secret_name: str, secret_value: str):
 def serve_index():
     return send_from_directory(".", "index.html")
 
+@app.get("/student-profiles")
+def student_profiles():
+    auth = request.headers.get("Authorization", "")
+    if not PROFILES_TOKEN or not hmac.compare_digest(auth, f"Bearer {PROFILES_TOKEN}"):
+        return jsonify({"error": "unauthorized"}), 401
+    return Response(profiles_json(), mimetype="application/json")
+
 @app.post("/request-credentials")
 def request_credentials():
     data = request.get_json(silent=True) or {}
     student_name = data.get("student_name", "").strip()
     student_mail = data.get("student_mail", "").strip().lower()
+    # optional profile: comma-separated skills / locations narrow the jobs this student is mailed
+    skills = data.get("skills")
+    locations = data.get("locations")
    
 
 
@@ -98,7 +89,7 @@ def request_credentials():
     
 
     try:
-        save_student_to_db(student_name, student_mail)
+        save_student(student_name, student_mail, skills, locations)
         upsert_secret(EMAIL_SECRET, student_mail)
         upsert_secret(NAMES_SECRET, student_name)
 
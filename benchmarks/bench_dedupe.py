@@ -0,0 +1,44 @@
+# benchmarks/bench_dedupe.py
+# Time dedupe.merge_duplicates() on growing synthetic job lists in which
+# every opening is posted by up to three sources with small variations, to
+# check that cost grows about linearly and that variants are merged.
+#
+#   python benchmarks/bench_dedupe.py [max_jobs]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dedupe import merge_duplicates  # noqa: E402
+
+ROLES = ["Python Developer", "Data Analyst", "Data Scientist", "Machine Learning Engineer", "React Developer",
+         "Full Stack Developer", "Business Analyst", "QA Engineer", "DevOps Engineer", "AI Engineer"]
+LEVELS = ["Fresher", "Intern", "Trainee", "Junior", "Associate"]
+VARIANTS = ["{r} - {l}", "{r} ({l})", "{l} {r}", "{r} | {l}", "{r}, {l}"]
+SUFFIXES = ["", " Pvt Ltd", " Private Limited", " Pvt. Ltd.", " LLP"]
+
+def build_jobs(openings, seed=3):
+    rnd = random.Random(seed)
+    jobs = []
+    for k in range(openings):
+        role, level = rnd.choice(ROLES), rnd.choice(LEVELS)
+        company = f"Company{k}"
+        for source in rnd.sample(["Infopark", "Naukri", "LinkedIn"], rnd.randint(1, 3)):
+            jobs.append({"title": rnd.choice(VARIANTS).format(r=role, l=level),
+                         "company": company + rnd.choice(SUFFIXES),
+                         "link": f"https://{source.lower()}.example/{k}", "source": source})
+    rnd.shuffle(jobs)
+    return jobs
+
+if __name__ == "__main__":
+    max_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    size = 1_000
+    while size <= max_jobs:
+        jobs = build_jobs(size // 2)
+        started = time.perf_counter()
+        merged, stats = merge_duplicates(jobs)
+        elapsed = time.perf_counter() - started
+        print(f"{len(jobs):7,} jobs -> {len(merged):7,} ({stats['exact']:,} exact, {stats['near']:,} near) "
+              f"in {elapsed:6.2f}s  ({elapsed / len(jobs) * 1e6:5.0f} µs/job)")
+        size *= 2
@@ -0,0 +1,84 @@
+# benchmarks/bench_matcher.py
+# Compare the compiled KeywordMatcher behind looks_relevant() with the
+# original substring-scan implementation on a large synthetic title corpus,
+# and time the batch classify_jobs() pass over the same titles.
+#
+#   python benchmarks/bench_matcher.py [n_titles]
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402
+
+# -------------------------
+# ORIGINAL IMPLEMENTATION (kept here only as the baseline)
+# -------------------------
+def legacy_looks_relevant(title, snippet=""):
+    text = f"{title} {snippet}".lower()
+    if any(ex in text for ex in app.EXCLUDE_LOWER):
+        return False
+    if not any(term in text for term in app.INCLUDE_TERMS):
+        return False
+    if re.search(app.HIGH_EXPERIENCE_RE, text):
+        return False
+    if re.search(r"\b(senior|lead|manager|director|principal|head|vp)\b", text):
+        return False
+    return True
+
+# -------------------------
+# CORPUS
+# -------------------------
+FILLER = [
+    "engineer", "developer", "executive", "associate", "specialist", "kochi", "remote",
+    "hybrid", "trivandrum", "bangalore", "team", "maintenance", "html", "digital", "sales",
+    "support", "customer", "office", "accounts", "hr", "(fresher)", "- urgent", "opening",
+]
+
+def build_corpus(n, seed=42):
+    rnd = random.Random(seed)
+    vocab = app.INCLUDE_TERMS + app.EXCLUDE_KEYWORDS + app.PREFER_TERMS
+    titles = []
+    for _ in range(n):
+        words = rnd.sample(FILLER, rnd.randint(1, 4))
+        if rnd.random() < 0.7:
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(vocab))
+        if rnd.random() < 0.1:
+            words.append(f"{rnd.randint(0, 8)}+ years")
+        titles.append(" ".join(words).title())
+    return titles
+
+def timed(fn, titles):
+    started = time.perf_counter()
+    results = [fn(t) for t in titles]
+    return results, time.perf_counter() - started
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    titles = build_corpus(n)
+
+    started = time.perf_counter()
+    app.get_matcher()
+    build_s = time.perf_counter() - started
+
+    legacy, legacy_s = timed(legacy_looks_relevant, titles)
+    compiled, compiled_s = timed(app.looks_relevant, titles)
+    changed = [t for t, a, b in zip(titles, legacy, compiled) if a != b]
+
+    print(f"Titles: {n:,}   matcher build: {build_s * 1000:.1f} ms")
+    print(f"legacy   : {legacy_s:7.3f}s  {n / legacy_s:12,.0f} titles/s  accepted {sum(legacy):,}")
+    print(f"compiled : {compiled_s:7.3f}s  {n / compiled_s:12,.0f} titles/s  accepted {sum(compiled):,}")
+    print(f"speed-up : {legacy_s / compiled_s:.1f}x")
+    print(f"decisions changed: {len(changed):,} (word boundaries: 'java' no longer hits 'javascript', "
+          f"'ml' no longer hits 'html', mixed-case include terms now match)")
+    for t in changed[:10]:
+        print(f"   {legacy_looks_relevant(t)!s:>5} -> {app.looks_relevant(t)!s:<5} {t}")
+
+    candidates = [{"title": t} for t in titles]
+    started = time.perf_counter()
+    mask, reasons = app.classify_jobs(candidates)
+    batch_s = time.perf_counter() - started
+    assert list(mask) == compiled, "classify_jobs disagrees with looks_relevant"
+    print(f"batch    : {batch_s:7.3f}s  {n / batch_s:12,.0f} titles/s  (classify_jobs, with reason codes)")
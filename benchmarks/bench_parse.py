@@ -0,0 +1,114 @@
+# benchmarks/bench_parse.py
+# Parse time and peak memory of the page parsing layer: the original
+# full-document html.parser tree vs lxml with each source's SoupStrainer.
+# Pages come from the response cache (SCRAPER_CACHE_DIR) when a previous
+# run recorded them, else from a synthetic corpus shaped like the parks.
+#
+#   python benchmarks/bench_parse.py [rounds]
+import os
+import random
+import sys
+import time
+import tracemalloc
+import urllib.parse
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402
+from sources import SOURCES, parse_hub_page, source_urls  # noqa: E402
+
+# -------------------------
+# RECORDED / SYNTHETIC PAGES
+# -------------------------
+def source_for(url):
+    """Registry source a recorded page belongs to (by host), or None."""
+    host = app.site_domain(url)
+    for src in SOURCES:
+        urls = [src["url"]] if src["kind"] == "hub" else source_urls(src)
+        if any(app.site_domain(u) == host for u in urls):
+            return src
+    return None
+
+def recorded_pages():
+    pages = []
+    for entry in app.response_cache.pages():
+        src = source_for(entry["url"])
+        if src and src["tier"] == "http":
+            pages.append((src, entry["url"], entry["body"]))
+    return pages
+
+NOISE = "<div class='nav'><ul>" + "".join(f"<li><span>Menu {i}</span></li>" for i in range(40)) + "</ul></div>"
+SCRIPT = "<script>var cfg = {" + ",".join(f"k{i}: {i}" for i in range(300)) + "};</script>"
+
+def table_page(rnd, rows=80):
+    body = "".join(
+        f"<tr><td>{i}</td><td>{rnd.choice(['Python Developer', 'Data Analyst', 'PHP Developer'])} {i}</td>"
+        f"<td>Company {rnd.randint(1, 500)}</td><td><a href='/job/{i}'>View</a></td></tr>" for i in range(rows))
+    footer = "".join(f"<p class='blurb'>Lorem <b>ipsum</b> <i>dolor</i> {i}</p>" for i in range(120))
+    return (f"<html><head>{SCRIPT}</head><body>{NOISE}<table><tr><th>#</th><th>Title</th><th>Company</th></tr>"
+            f"{body}</table>{footer}</body></html>")
+
+def hub_page(rnd, links=60):
+    anchors = "".join(f"<div class='card'><h3>Block {i}</h3><p>{'text ' * 30}</p>"
+                      f"<a href='/{rnd.choice(['careers', 'jobs', 'about', 'news'])}/{i}'>Link {i}</a></div>"
+                      for i in range(links))
+    return f"<html><head>{SCRIPT}</head><body>{NOISE}{anchors}</body></html>"
+
+def synthetic_pages(n=20, seed=7):
+    rnd = random.Random(seed)
+    table_src = next(s for s in SOURCES if s["name"] == "Infopark")
+    hub_src = next(s for s in SOURCES if s["kind"] == "hub")
+    pages = []
+    for i in range(n):
+        pages.append((table_src, table_src["url"].format(page=i + 1), table_page(rnd)))
+        pages.append((hub_src, f"{hub_src['url']}/careers/{i}", hub_page(rnd)))
+    return pages
+
+# -------------------------
+# PARSE PATHS
+# -------------------------
+def parse_fn(src):
+    return parse_hub_page if src["kind"] == "hub" else src["parse"]
+
+def legacy_parse(src, url, body):
+    soup = BeautifulSoup(body, "html.parser")
+    return parse_fn(src)(soup, url, src)
+
+def fast_parse(src, url, body):
+    return app.extract_rows(app.make_soup(body, src["strain"]), url, lambda soup, u: parse_fn(src)(soup, u, src))
+
+def measure(fn, pages, rounds):
+    fn(*pages[0])  # warm-up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        results = [fn(src, url, body) for src, url, body in pages]
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    peak = 0
+    for src, url, body in pages:
+        tracemalloc.reset_peak()
+        fn(src, url, body)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return results, elapsed, peak
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pages = recorded_pages()
+    origin = "recorded"
+    if not pages:
+        pages, origin = synthetic_pages(), "synthetic"
+    size = sum(len(body) for _, _, body in pages)
+    hosts = sorted({urllib.parse.urlsplit(url).netloc for _, url, _ in pages})
+    print(f"Pages: {len(pages)} {origin} ({size / 1e6:.1f} MB) from {', '.join(hosts)}; backend: {app.HTML_PARSER}")
+
+    legacy, legacy_s, legacy_peak = measure(legacy_parse, pages, rounds)
+    fast, fast_s, fast_peak = measure(fast_parse, pages, rounds)
+    per_page = rounds * len(pages)
+    for label, seconds, peak in (("html.parser, full tree", legacy_s, legacy_peak),
+                                 (f"{app.HTML_PARSER}, strained", fast_s, fast_peak)):
+        print(f"{label:<23}: {seconds / per_page * 1000:7.2f} ms/page   peak {peak / 1e6:6.2f} MB/page")
+    print(f"speed-up: {legacy_s / fast_s:.1f}x   peak memory: {legacy_peak / fast_peak:.1f}x lower")
+    mismatched = sum(a != b for a, b in zip(legacy, fast))
+    print(f"pages whose rows differ between paths: {mismatched}")
@@ -0,0 +1,199 @@
+# benchmarks/bench_replay.py
+# Throughput and memory of the offline stages, per source, over pages
+# recorded with SCRAPER_RECORD=1 (fixtures.py). The stages are parse
+# (soup + the source's parser, strained like a live run), filter
+# (classify_jobs) and dedupe (StreamDeduper). Detail pages recorded by
+# enrichment are timed through parse_details(). Without fixtures it falls
+# back to bench_parse's synthetic pages. --pipeline also times a whole
+# stream_jobs() run replayed from the fixtures. --save writes the numbers
+# as JSON, and --compare exits 1 when a stage got slower than a saved
+# run by more than --tolerance, so parser changes can be checked before
+# they ship.
+#
+#   python benchmarks/bench_replay.py [--fixtures DIR] [--rounds N] [--pipeline]
+#                                     [--save FILE] [--compare FILE] [--tolerance 0.2]
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+# pages only ever come from the fixtures (never the network or the response
+# cache) and the seen-jobs history is a throwaway database
+os.environ["SCRAPER_REPLAY"] = "1"
+os.environ["SEEN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_replay_"), "seen_jobs.db")
+os.environ["SCRAPER_EARLY_STOP"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402
+import job_store  # noqa: E402
+from dedupe import StreamDeduper  # noqa: E402
+from details import parse_details  # noqa: E402
+from fixtures import FixtureStore  # noqa: E402
+from sources import SOURCES, parse_hub_page  # noqa: E402
+
+MIN_COMPARE_SECONDS = 0.005  # stages faster than this are timer noise, not compared
+
+# -------------------------
+# CORPUS
+# -------------------------
+def fixture_pages(store):
+    """{source name: [(source, url, body)]} of the recorded pages; unknown sources are reported and dropped."""
+    by_name = {src["name"]: src for src in SOURCES}
+    corpus, unknown = defaultdict(list), 0
+    for name, url, kind, body in store.pages():
+        if name == "details":
+            corpus[name].append((None, url, body))
+        elif name in by_name:
+            corpus[name].append((by_name[name], url, body))
+        else:
+            unknown += 1
+    if unknown:
+        print(f"⚠️ {unknown} recorded page(s) belong to no registry source; skipped")
+    return corpus
+
+def synthetic_corpus():
+    from bench_parse import synthetic_pages
+    corpus = defaultdict(list)
+    for src, url, body in synthetic_pages():
+        corpus[src["name"]].append((src, url, body))
+    return corpus
+
+# -------------------------
+# STAGES
+# -------------------------
+def parse_page(src, url, body):
+    """Raw candidates of one page (a detail page yields its facts instead)."""
+    if src is None:
+        return [app.extract_rows(app.make_soup(body), url, lambda soup, u: parse_details(soup))]
+    if src["kind"] == "hub":
+        page = app.extract_rows(app.make_soup(body, src["strain"]), url,
+                                lambda soup, u: parse_hub_page(soup, u, src))
+        return page["jobs"]
+    return app.extract_rows(app.make_soup(body, src["strain"]), url, lambda soup, u: src["parse"](soup, u, src))
+
+def parse_stage(pages):
+    return [dict(row, source=src["name"]) if src else row for src, url, body in pages
+            for row in parse_page(src, url, body)]
+
+def filter_stage(rows):
+    mask, _ = app.classify_jobs(rows)
+    return [app.normalize_job(row) for row, keep in zip(rows, mask) if keep]
+
+def dedupe_stage(jobs):
+    deduper = StreamDeduper()
+    return [record for record in map(deduper.add, jobs) if record is not None]
+
+def measure(fn, data, rounds):
+    """(result, seconds per round, peak bytes, bytes still held by the result) of fn(data)."""
+    result = fn(data)  # warm-up (compiles the matcher, builds the MinHash tables)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(data)
+    seconds = (time.perf_counter() - started) / rounds
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(data)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak - before, held - before
+
+def bench_source(pages, rounds):
+    """{stage: {"items", "seconds", "peak", "held"[, "kb"]}} for one source's pages (seconds per round)."""
+    results = {}
+    rows, seconds, peak, held = measure(parse_stage, pages, rounds)
+    results["parse"] = {"items": len(pages), "seconds": seconds, "peak": peak, "held": held,
+                        "kb": sum(len(body) for _, _, body in pages) / 1e3}
+    if pages[0][0] is None:
+        return results
+    jobs, seconds, peak, held = measure(filter_stage, rows, rounds)
+    results["filter"] = {"items": len(rows), "seconds": seconds, "peak": peak, "held": held}
+    _, seconds, peak, held = measure(dedupe_stage, jobs, rounds)
+    results["dedupe"] = {"items": len(jobs), "seconds": seconds, "peak": peak, "held": held}
+    return results
+
+def bench_pipeline(rounds):
+    """Seconds and jobs of a replayed stream_jobs() run (best of `rounds`, each on an empty history)."""
+    best, jobs = None, []
+    for i in range(rounds):
+        job_store.SEEN_DB_PATH = f"{os.environ['SEEN_DB_PATH']}.{i}"
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # the run report
+            jobs = app.fetch_all_jobs(delta_only=False, enrich=False)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {"items": len(jobs), "seconds": best, "peak": 0, "held": 0}
+
+# -------------------------
+# REPORT
+# -------------------------
+def print_results(results):
+    width = max(len(key) for key in results)
+    print(f"{'source / stage':<{width}} {'items':>6} {'ms':>8} {'items/s':>9} {'peak KB':>8} {'held KB':>8}")
+    for key, r in results.items():
+        rate = r["items"] / r["seconds"] if r["seconds"] else 0.0
+        size = f"  ({r['kb']:.0f} KB of HTML)" if "kb" in r else ""
+        print(f"{key:<{width}} {r['items']:>6} {r['seconds'] * 1000:>8.2f} {rate:>9,.0f} "
+              f"{r['peak'] / 1e3:>8.0f} {r['held'] / 1e3:>8.0f}{size}")
+
+def compare(results, baseline, tolerance):
+    """Print stages whose time moved more than `tolerance`; returns the slowed-down ones."""
+    slower = []
+    for key, r in results.items():
+        old = baseline.get(key)
+        if not old or old["items"] != r["items"]:
+            continue  # new stage or different corpus: nothing to compare against
+        if max(old["seconds"], r["seconds"]) < MIN_COMPARE_SECONDS:
+            continue
+        change = r["seconds"] / old["seconds"] - 1
+        if abs(change) > tolerance:
+            print(f"{'🐢' if change > 0 else '🚀'} {key}: {old['seconds'] * 1000:.2f} -> "
+                  f"{r['seconds'] * 1000:.2f} ms ({change:+.0%})")
+            if change > 0:
+                slower.append(key)
+    return slower
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-source parse / filter / dedupe benchmark over recorded pages")
+    parser.add_argument("--fixtures", default=None, help="fixture directory (default SCRAPER_FIXTURES_DIR)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--pipeline", action="store_true", help="also time a replayed stream_jobs() run")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to check for slowdowns")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown per stage (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    app.fixture_store = FixtureStore(args.fixtures)
+    corpus, origin = fixture_pages(app.fixture_store), "recorded"
+    if not corpus:
+        corpus, origin = synthetic_corpus(), "synthetic"
+    pages = sum(len(p) for p in corpus.values())
+    print(f"Pages: {pages} {origin} from {len(corpus)} source(s) in {app.fixture_store.directory}; "
+          f"backend: {app.HTML_PARSER}, {args.rounds} round(s)")
+
+    results = {}
+    for name, source_pages in sorted(corpus.items()):
+        for stage, r in bench_source(source_pages, args.rounds).items():
+            results[f"{name} / {stage}"] = r
+    everything = [page for name in sorted(corpus) if name != "details" for page in corpus[name]]
+    if everything:
+        for stage, r in bench_source(everything, args.rounds).items():
+            results[f"all sources / {stage}"] = r
+    if args.pipeline and origin == "recorded":
+        results["all sources / pipeline"] = bench_pipeline(args.rounds)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        if slower:
+            print(f"❌ {len(slower)} stage(s) slower than {args.compare} by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print(f"✅ No stage slower than {args.compare} by more than {args.tolerance:.0%}")
@@ -0,0 +1,61 @@
+# benchmarks/bench_startup.py
+# Startup cost of app.py: wall time of a fresh interpreter that imports app
+# and classifies one title, the slowest modules in `python -X importtime`,
+# and which heavy dependencies an import pulls in. With --browser, also the
+# time to resolve chromedriver and launch one headless Chrome.
+#
+#   python benchmarks/bench_startup.py [runs] [--browser]
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["pandas", "numpy", "requests", "bs4", "lxml", "selenium", "webdriver_manager", "aiohttp"]
+
+def run_python(code, *flags):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return proc, time.perf_counter() - started
+
+def import_times():
+    """(cumulative_us, module) per top-level import line of -X importtime, slowest first."""
+    proc, _ = run_python("import app", "-X", "importtime")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if m and len(m.group(3)) <= 3:  # app itself and its direct imports
+            rows.append((int(m.group(2)), m.group(4)))
+    return sorted(rows, reverse=True)
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    runs = int(args[0]) if args else 5
+
+    walls = [run_python("import app; app.looks_relevant('Python Developer (Fresher)')")[1] for _ in range(runs)]
+    print(f"cold start (import app + looks_relevant): median {statistics.median(walls) * 1000:.0f} ms "
+          f"over {runs} run(s), python alone ~{run_python('pass')[1] * 1000:.0f} ms")
+
+    rows = import_times()
+    total = next((us for us, mod in rows if mod == "app"), 0)
+    print(f"import app: {total / 1000:.0f} ms; slowest direct imports:")
+    for us, mod in [r for r in rows if r[1] != "app"][:8]:
+        print(f"   {us / 1000:7.1f} ms  {mod}")
+
+    proc, _ = run_python(f"import sys, app; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))")
+    loaded = proc.stdout.split()
+    print(f"heavy modules loaded by import: {', '.join(loaded) or 'none'}")
+
+    if "--browser" in sys.argv:
+        sys.path.insert(0, ROOT)
+        import app
+        started = time.perf_counter()
+        app.chromedriver_path()
+        resolved = time.perf_counter() - started
+        started = time.perf_counter()
+        d = app.build_driver()
+        launched = time.perf_counter() - started
+        d.quit()
+        print(f"chromedriver path: {resolved * 1000:.0f} ms, Chrome launch: {launched * 1000:.0f} ms")
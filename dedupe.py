@@ -0,0 +1,163 @@
+# dedupe.py
+# Merges the same opening scraped from several sources into one record.
+#
+# Records sharing a canonical link (links.py) are the same job when their
+# titles are similar too (a shared "apply" or careers page links many
+# different jobs). Titles and companies are normalized next ("Python Developer - Fresher"
+# and "Python Developer (Fresher)" become the same title, "Acme Pvt Ltd"
+# becomes "acme"), so exact repeats collapse through a dict. The remaining
+# records are compared by MinHash signatures of their token shingles, and
+# locality-sensitive hashing (bands of signature rows) only pairs up
+# records that share a band bucket. A candidate pair is merged when the
+# exact Jaccard similarity of the title shingles reaches the threshold and
+# the companies match. Jobs are merged one at a time as they arrive
+# (StreamDeduper), so work grows roughly linearly with the number of jobs.
+import re
+import zlib
+
+from links import canonical_link
+
+LEGAL_SUFFIXES = {
+    "pvt", "private", "ltd", "limited", "llp", "llc", "inc", "incorporated", "corp",
+    "corporation", "co", "company", "plc", "gmbh", "opc",
+}
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+_PRIME = 4294967291  # largest prime below 2**32
+LINK_TITLE_THRESHOLD = 0.5  # title similarity that makes two jobs sharing a link the same job
+
+def normalize_title(title):
+    return " ".join(_NON_WORD.sub(" ", (title or "").lower()).split())
+
+def normalize_company(company):
+    words = _NON_WORD.sub(" ", (company or "").lower()).split()
+    while words and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+def shingles(title):
+    """Title words and word bigrams."""
+    words = title.split()
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def similar_titles(a, b, threshold=LINK_TITLE_THRESHOLD):
+    """Jaccard similarity of the normalized title shingles of `a` and `b` reaches `threshold`."""
+    return jaccard(shingles(normalize_title(a)), shingles(normalize_title(b))) >= threshold
+
+def same_company(a, b):
+    """Normalized names equal, or sharing at least half their words ("acme" / "acme technologies")."""
+    return a == b or (bool(a) and bool(b) and jaccard(set(a.split()), set(b.split())) >= 0.5)
+
+class MinHasher:
+    """`num_perm` universal hash functions (a*x + b) mod p over crc32 shingle ids."""
+
+    def __init__(self, num_perm=64, seed=1):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        import numpy as np
+        ids = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64,
+                          count=len(shingle_set))
+        if not len(ids):
+            return np.full(len(self.a), _PRIME, dtype=np.uint64)
+        return ((np.outer(ids, self.a) + self.b) % _PRIME).min(axis=0)
+
+class StreamDeduper:
+    """
+    merge_duplicates() one job at a time. add() returns a new merged record
+    for the first job of every group and None for a job folded into an
+    earlier record (whose "links" and "sources" then grow), so the merge
+    can run while jobs are still being scraped. Records sharing a link and
+    a similar title, then a normalized title / company, then a MinHash LSH
+    band bucket with a similar title at the same company are one group.
+    Groups depend on the order jobs are added in; app.py adds them in
+    job_order() once scraping is done.
+    """
+
+    def __init__(self, threshold=0.65, num_perm=64, bands=16):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.hasher = None
+        self.records = []         # merged records, in first-seen order
+        self.by_link = {}         # canonical link -> [(title shingles, record index)] of its distinct jobs
+        self.by_key = {}          # (title, company) -> record index
+        self.keys = []            # distinct keys: (company, title shingles, record index)
+        self.buckets = {}         # (band, band of signature) -> index in keys of the bucket's first key
+        self.stats = {"link": 0, "exact": 0, "near": 0}
+
+    def _near(self, key, shingle_set, band_keys):
+        for band_key in band_keys:
+            head = self.buckets.get(band_key)
+            if head is None:
+                continue
+            company, head_set, record = self.keys[head]
+            if same_company(company, key[1]) and jaccard(head_set, shingle_set) >= self.threshold:
+                return record
+        return None
+
+    def add(self, job):
+        key = (normalize_title(job.get("title", "")), normalize_company(job.get("company", "")))
+        link = canonical_link(job.get("link") or "")
+        link_usable = link.startswith("http")
+        shingle_set = shingles(key[0])
+
+        target, kind = None, None
+        # a link shared by different titles is a listing / apply page, so only similar titles merge by link
+        for link_shingles, record in self.by_link.get(link, ()) if link_usable else ():
+            if jaccard(link_shingles, shingle_set) >= LINK_TITLE_THRESHOLD:
+                target, kind = record, "link"
+                break
+        if target is None and key in self.by_key:
+            target, kind = self.by_key[key], "exact"
+
+        band_keys = None
+        if key not in self.by_key:
+            if self.hasher is None:
+                self.hasher = MinHasher(self.num_perm)
+            # company words join the signature so buckets group by employer
+            sig = self.hasher.signature(shingle_set | {f"@{w}" for w in key[1].split()})
+            rows = self.num_perm // self.bands
+            band_keys = [(band, sig[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+            if target is None:
+                target = self._near(key, shingle_set, band_keys)
+                kind = "near" if target is not None else None
+
+        new = target is None
+        if new:
+            target = len(self.records)
+            record = dict(job)
+            record["links"], record["sources"] = [], []
+            self.records.append(record)
+        else:
+            self.stats[kind] += 1
+        record = self.records[target]
+        if job.get("link") and job["link"] not in record["links"]:
+            record["links"].append(job["link"])
+        if job.get("source") and job["source"] not in record["sources"]:
+            record["sources"].append(job["source"])
+
+        if link_usable and kind != "link":
+            self.by_link.setdefault(link, []).append((shingle_set, target))
+        if band_keys is not None:
+            self.by_key[key] = target
+            self.keys.append((key[1], shingle_set, target))
+            for band_key in band_keys:
+                self.buckets.setdefault(band_key, len(self.keys) - 1)
+        return record if new else None
+
+def merge_duplicates(jobs, threshold=0.65, num_perm=64, bands=16):
+    """
+    Merge exact and near-duplicate jobs. Returns (merged, stats): merged
+    keeps the first record of every group, in input order, with "links" and
+    "sources" listing every member's link and source; stats counts the
+    records folded away as {"link": n, "exact": n, "near": n}.
+    """
+    deduper = StreamDeduper(threshold, num_perm, bands)
+    merged = [record for record in map(deduper.add, jobs) if record is not None]
+    return merged, deduper.stats
@@ -0,0 +1,117 @@
+# details.py
+# Facts read from a job's detail page: the experience range, location,
+# posted date and skills a listing card rarely shows. Structured data
+# (schema.org JobPosting in JSON-LD) is used when the page has it, then
+# the visible text is searched. Like the parsers in sources.py this only
+# looks at an already-fetched BeautifulSoup document; fetching and the
+# per-link cache live in app.py / job_store.py.
+import json
+import re
+
+# Matched as whole words in the page text, reported in this order.
+SKILLS = [
+    "python", "django", "flask", "fastapi", "pandas", "numpy", "scikit-learn", "tensorflow", "pytorch",
+    "machine learning", "deep learning", "nlp", "computer vision", "sql", "mysql", "postgresql", "mongodb",
+    "power bi", "tableau", "excel", "javascript", "typescript", "react", "node.js", "html", "css",
+    "rest api", "git", "docker", "aws", "azure", "linux",
+]
+_SKILL_RE = re.compile(r"(?<![\w.+#-])(" + "|".join(re.escape(s) for s in SKILLS) + r")(?![\w+#-])", re.IGNORECASE)
+
+_YEARS = r"(?:years?|yrs?)"
+_EXPERIENCE_RANGE = re.compile(rf"\b(\d{{1,2}})\s*(?:-|–|to)\s*(\d{{1,2}})\s*{_YEARS}", re.IGNORECASE)
+_EXPERIENCE_MIN = re.compile(rf"\b(?:minimum\s+(?:of\s+)?|at\s+least\s+)?(\d{{1,2}})\s*\+?\s*{_YEARS}"
+                             rf"(?:\s+of)?\s+(?:\w+\s+){{0,3}}experience", re.IGNORECASE)
+_FRESHER = re.compile(r"\bfreshers?\b|\b0\s*(?:-|–|to)\s*1\s*" + _YEARS, re.IGNORECASE)
+_LOCATION = re.compile(r"\b(?:job\s+)?locations?\s*[:\-–]\s*([A-Za-z][A-Za-z .,/()-]{1,60})", re.IGNORECASE)
+_POSTED = re.compile(r"\b(?:posted|date\s+posted)\s*(?:on)?\s*[:\-–]?\s*"
+                     r"(today|just now|\d+\+?\s*(?:hours?|days?|weeks?|months?)\s+ago|"
+                     r"\d{1,2}[ /-][A-Za-z]{3,9}[ /-]\d{2,4}|\d{4}-\d{2}-\d{2})", re.IGNORECASE)
+
+TEXT_LIMIT = 20000  # characters of page text searched; requirements sit near the top
+
+
+def _job_posting(soup):
+    """The first schema.org JobPosting object in the page's JSON-LD, or {}."""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            data = data.get("@graph", [data])
+        for item in data if isinstance(data, list) else []:
+            if isinstance(item, dict) and item.get("@type") in ("JobPosting", ["JobPosting"]):
+                return item
+    return {}
+
+
+def _posting_location(posting):
+    places = posting.get("jobLocation") or []
+    for place in places if isinstance(places, list) else [places]:
+        address = place.get("address", {}) if isinstance(place, dict) else {}
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "addressRegion") if address.get(k)]
+            if parts:
+                return ", ".join(dict.fromkeys(parts))
+    return ""
+
+
+def _posting_experience(posting):
+    months = posting.get("experienceRequirements")
+    if isinstance(months, dict):
+        months = months.get("monthsOfExperience")
+    try:
+        years = float(months) / 12
+    except (TypeError, ValueError):
+        return None
+    return (int(years), None)
+
+
+def experience_range(text):
+    """(min years, max years or None) stated in `text`, or None."""
+    m = _EXPERIENCE_RANGE.search(text)
+    if m:
+        low, high = sorted((int(m.group(1)), int(m.group(2))))
+        return (low, high)
+    m = _EXPERIENCE_MIN.search(text)
+    if m:
+        return (int(m.group(1)), None)
+    if _FRESHER.search(text):
+        return (0, 1)
+    return None
+
+
+def parse_details(soup):
+    """
+    {"experience_min", "experience_max", "location", "posted", "skills"} of
+    a detail page; fields the page doesn't state are None / "" / [].
+    """
+    posting = _job_posting(soup)
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    lines = soup.get_text("\n", strip=True)[:TEXT_LIMIT]  # one line per element, so fields don't run on
+    text = " ".join(lines.split())
+    description = posting.get("description") or ""
+    if description:
+        description = " ".join(re.sub(r"<[^>]+>", " ", description).split())
+
+    experience = experience_range(description) or _posting_experience(posting) or experience_range(text)
+    location = _posting_location(posting)
+    if not location:
+        m = _LOCATION.search(lines)
+        location = m.group(1).strip(" ,.-") if m else ""
+    posted = str(posting.get("datePosted") or "")[:10]
+    if not posted:
+        m = _POSTED.search(text)
+        posted = m.group(1) if m else ""
+    skills = posting.get("skills") or ""
+    if isinstance(skills, list):
+        skills = ", ".join(map(str, skills))
+    found = {s.lower() for s in _SKILL_RE.findall(f"{description} {skills} {text}")}
+    return {
+        "experience_min": experience[0] if experience else None,
+        "experience_max": experience[1] if experience else None,
+        "location": location,
+        "posted": posted,
+        "skills": [s for s in SKILLS if s in found],
+    }
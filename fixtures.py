@@ -0,0 +1,93 @@
+# fixtures.py
+# Raw pages recorded from live runs, so a scrape can be replayed offline.
+# With SCRAPER_RECORD=1 app.py saves every page it fetches: the HTTP body,
+# and the browser's page_source after its waits and scrolls. The files go
+# under FIXTURES_DIR/<source>/, and index.json maps each URL to its
+# source and files. With SCRAPER_REPLAY=1 the HTTP tier and the Chrome
+# driver serve these files instead of the network, so parser and filter
+# changes run against the same pages every time (see
+# benchmarks/bench_replay.py).
+import json
+import os
+import re
+import threading
+
+from http_cache import url_key
+
+FIXTURES_DIR = os.getenv("SCRAPER_FIXTURES_DIR", "fixtures")
+KINDS = ("http", "browser")  # how a page was fetched; a browser copy is the rendered DOM
+
+
+def source_slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", (name or "").lower()).strip("-") or "unknown"
+
+
+class FixtureStore:
+    """Recorded pages under `directory`, indexed by URL."""
+
+    def __init__(self, directory=None):
+        self.directory = directory or FIXTURES_DIR
+        self._lock = threading.Lock()
+        self._index = None
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def index(self):
+        """{url: {"source": name, "http": path, "browser": path}} (paths relative to the directory)."""
+        with self._lock:
+            if self._index is None:
+                try:
+                    with open(self.index_path, encoding="utf-8") as f:
+                        self._index = json.load(f)
+                except (OSError, ValueError):
+                    self._index = {}
+            return self._index
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def record(self, url, kind, body, source=""):
+        """Save `body` as the `kind` copy of `url`; a later recording of the same page replaces it."""
+        index = self.index()
+        relative = f"{source_slug(source)}/{url_key(url)[:16]}-{kind}.html"
+        self._write(os.path.join(self.directory, relative), body)
+        with self._lock:
+            entry = index.setdefault(url, {})
+            entry["source"] = source or entry.get("source", "")
+            entry[kind] = relative
+            self._write(self.index_path, json.dumps(index, indent=1, sort_keys=True))
+
+    def _read(self, relative):
+        try:
+            with open(os.path.join(self.directory, relative), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def page(self, url, kind="http"):
+        """
+        Recorded body of `url`, or None. A browser replay falls back to the
+        HTTP copy; an HTTP replay never gets the rendered copy, so a page
+        whose HTTP copy was missing still goes to the browser as it did live.
+        """
+        entry = self.index().get(url)
+        if not entry:
+            return None
+        for candidate in ((kind, "http") if kind == "browser" else (kind,)):
+            if entry.get(candidate):
+                return self._read(entry[candidate])
+        return None
+
+    def pages(self):
+        """(source name, url, kind, body) of every recorded copy, in URL order."""
+        for url, entry in sorted(self.index().items()):
+            for kind in KINDS:
+                body = self._read(entry[kind]) if entry.get(kind) else None
+                if body is not None:
+                    yield entry.get("source", ""), url, kind, body
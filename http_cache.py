@@ -0,0 +1,129 @@
+# http_cache.py
+# On-disk cache of fetched pages keyed by URL. Each entry keeps the body,
+# ETag, Last-Modified and a content hash so app.py can revalidate with
+# conditional requests and, when a page's bytes are unchanged, reuse the
+# rows it parsed last time instead of running BeautifulSoup again.
+#
+# Files are gzipped JSON written via rename, so a cache directory restored
+# between GitHub Actions runs is never half-written; entries from another
+# CACHE_VERSION are ignored and prune() drops anything older than max_age.
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", ".scraper_cache")
+CACHE_VERSION = 1  # bump when parse_* output changes shape
+
+
+def url_key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def content_hash(body):
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+
+
+class ResponseCache:
+    """Pages and parsed rows under `directory`; a disabled cache stores nothing."""
+
+    def __init__(self, directory=None, enabled=True):
+        self.directory = directory or CACHE_DIR
+        self.enabled = enabled
+
+    def _path(self, kind, key):
+        return os.path.join(self.directory, kind, key[:2], f"{key}.json.gz")
+
+    def _read(self, path):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get("version") == CACHE_VERSION else None
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    # ---- pages ----
+    def get(self, url):
+        if not self.enabled:
+            return None
+        return self._read(self._path("pages", url_key(url)))
+
+    def is_fresh(self, entry, ttl):
+        return entry is not None and time.time() - entry["fetched_at"] < ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, body, headers):
+        """Save a 200 response; returns the new entry."""
+        entry = {
+            "version": CACHE_VERSION,
+            "url": url,
+            "body": body,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_hash": content_hash(body),
+            "fetched_at": time.time(),
+        }
+        if self.enabled:
+            self._write(self._path("pages", url_key(url)), entry)
+        return entry
+
+    def revalidated(self, url, entry):
+        """Server answered 304 — keep the body, restart the TTL."""
+        entry = dict(entry, fetched_at=time.time())
+        if self.enabled:
+            self._write(self._path("pages", url_key(url)), entry)
+        return entry
+
+    def pages(self):
+        """Every cached page entry (unordered) — used by benchmarks to replay recorded pages."""
+        for root, _, files in os.walk(os.path.join(self.directory, "pages")):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    entry = self._read(os.path.join(root, name))
+                    if entry:
+                        yield entry
+
+    # ---- parsed rows ----
+    def get_rows(self, url, digest, parser):
+        if not self.enabled:
+            return None
+        data = self._read(self._path("rows", url_key(f"{parser}|{url}")))
+        if data is None or data["content_hash"] != digest:
+            return None
+        return data["rows"]
+
+    def put_rows(self, url, digest, parser, rows):
+        if self.enabled:
+            data = {"version": CACHE_VERSION, "content_hash": digest, "rows": rows}
+            self._write(self._path("rows", url_key(f"{parser}|{url}")), data)
+
+    def prune(self, max_age=14 * 24 * 3600):
+        """Delete cache files not written for `max_age` seconds; returns how many."""
+        removed = 0
+        cutoff = time.time() - max_age
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
@@ -0,0 +1,563 @@
+# job_store.py
+# On-disk SQLite store of every job the scraper has seen. app.py uses it to
+# stop paging once a page holds nothing new and to email only the delta
+# since the previous run. A job counts as seen when either its fingerprint
+# (title + company) or its canonical link (links.py) was recorded before.
+# The jobs table keeps the history of every job a run shortlisted, for
+# queries and month-partitioned Parquet exports (see the JOB HISTORY
+# section and `python job_store.py --help`).
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from dedupe import similar_titles
+from links import canonical_link
+
+SEEN_DB_PATH = os.getenv("SEEN_DB_PATH", "seen_jobs.db")
+
+
+def get_db(path=None):
+    conn = sqlite3.connect(path or SEEN_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_seen_db(path=None):
+    conn = get_db(path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS seen_jobs (
+            fingerprint TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            company TEXT,
+            link TEXT,
+            source TEXT,
+            relevant INTEGER NOT NULL DEFAULT 0,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            canonical_link TEXT
+        );
+        """
+    )
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(seen_jobs)")}
+    if "canonical_link" not in columns:  # databases written before links were indexed
+        conn.execute("ALTER TABLE seen_jobs ADD COLUMN canonical_link TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_jobs_last_seen ON seen_jobs (last_seen)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_jobs_link ON seen_jobs (canonical_link)")
+    conn.commit()
+    conn.close()
+
+
+def job_fingerprint(job):
+    """Stable id for a job: hash of its normalized title and company."""
+    title = " ".join((job.get("title") or "").lower().split())
+    company = " ".join((job.get("company") or "").lower().split())
+    return hashlib.sha1(f"{title}|{company}".encode("utf-8")).hexdigest()[:16]
+
+
+def job_keys(job):
+    """Keys a job is known by: its fingerprint and, when it has one, its canonical link."""
+    link = canonical_link(job.get("link") or "")
+    return (job_fingerprint(job), link) if link.startswith("http") else (job_fingerprint(job),)
+
+
+class SeenKeys:
+    """
+    Fingerprints of recorded jobs and the titles recorded per canonical
+    link. A link only identifies a job whose title is similar to one
+    recorded with it, since apply / careers pages are shared by many jobs.
+    """
+
+    def __init__(self, fingerprints=(), links=None):
+        self.fingerprints = set(fingerprints)
+        self.links = links or {}  # canonical link -> titles recorded with it
+
+    def __bool__(self):
+        return bool(self.fingerprints)
+
+    def knows(self, job):
+        keys = job_keys(job)
+        if keys[0] in self.fingerprints:
+            return True
+        return len(keys) > 1 and any(similar_titles(job.get("title"), t) for t in self.links.get(keys[1], ()))
+
+
+def is_known(job, keys):
+    return keys.knows(job)
+
+
+def load_seen_keys(path=None):
+    """SeenKeys of every job recorded by earlier runs."""
+    init_seen_db(path)
+    conn = get_db(path)
+    keys = SeenKeys(r["fingerprint"] for r in conn.execute("SELECT fingerprint FROM seen_jobs"))
+    for r in conn.execute("SELECT canonical_link, title FROM seen_jobs WHERE canonical_link IS NOT NULL"):
+        keys.links.setdefault(r["canonical_link"], []).append(r["title"])
+    conn.close()
+    return keys
+
+
+def record_seen(jobs, relevant=None, path=None):
+    """
+    Upsert jobs in one transaction: new fingerprints get first_seen, known
+    ones get last_seen bumped. `relevant` is an optional list of flags
+    parallel to `jobs`. Returns the fingerprints of jobs that were new,
+    i.e. neither their fingerprint nor their canonical link with a similar
+    title was recorded.
+    """
+    init_seen_db(path)
+    now = datetime.now().isoformat(timespec="seconds")
+    if relevant is None:
+        relevant = [True] * len(jobs)
+    rows = {}
+    for job, rel in zip(jobs, relevant):
+        if not job.get("title"):
+            continue
+        keys = job_keys(job)
+        fp = keys[0]
+        prev = rows.get(fp)
+        rows[fp] = (fp, job["title"].strip(), (job.get("company") or "").strip(), job.get("link") or "",
+                    job.get("source") or "", int(bool(rel) or bool(prev and prev[5])), now, now,
+                    keys[1] if len(keys) > 1 else None)
+
+    conn = get_db(path)
+    known = SeenKeys()
+    links = list({r[8] for r in rows.values() if r[8]})
+    for column, values in (("fingerprint", list(rows)), ("canonical_link", links)):
+        for i in range(0, len(values), 500):  # stay under SQLite's bound-parameter limit
+            chunk = values[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found = conn.execute(f"SELECT fingerprint, canonical_link, title FROM seen_jobs "
+                                 f"WHERE {column} IN ({placeholders})", chunk)
+            for r in found:
+                known.fingerprints.add(r["fingerprint"])
+                if r["canonical_link"]:
+                    known.links.setdefault(r["canonical_link"], []).append(r["title"])
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO seen_jobs (fingerprint, title, company, link, source, relevant, first_seen, last_seen,
+                                   canonical_link)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(fingerprint) DO UPDATE SET
+                last_seen = excluded.last_seen,
+                link = excluded.link,
+                canonical_link = COALESCE(excluded.canonical_link, seen_jobs.canonical_link),
+                relevant = MAX(seen_jobs.relevant, excluded.relevant)
+            """,
+            list(rows.values()),
+        )
+    conn.close()
+    return {fp for fp, row in rows.items()
+            if fp not in known.fingerprints
+            and not (row[8] and any(similar_titles(row[1], t) for t in known.links.get(row[8], ())))}
+
+
+# -------------------------
+# SOURCE HEALTH
+# Circuit-breaker state per source, so a source that tripped in one run is
+# skipped by the following runs until its cooldown ends.
+# -------------------------
+def init_health_db(path=None):
+    conn = get_db(path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS source_health (
+            name TEXT PRIMARY KEY,
+            trips INTEGER NOT NULL DEFAULT 0,
+            open_until REAL NOT NULL DEFAULT 0,
+            reason TEXT,
+            updated TEXT NOT NULL
+        );
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+def load_source_health(path=None):
+    """{source name: {"trips", "open_until", "reason"}} for every source with a record."""
+    init_health_db(path)
+    conn = get_db(path)
+    rows = conn.execute("SELECT name, trips, open_until, reason FROM source_health").fetchall()
+    conn.close()
+    return {r["name"]: {"trips": r["trips"], "open_until": r["open_until"], "reason": r["reason"]} for r in rows}
+
+
+def save_source_health(health, path=None):
+    """Upsert {source name: {"trips", "open_until", "reason"}} in one transaction."""
+    init_health_db(path)
+    now = datetime.now().isoformat(timespec="seconds")
+    conn = get_db(path)
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO source_health (name, trips, open_until, reason, updated) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                trips = excluded.trips, open_until = excluded.open_until,
+                reason = excluded.reason, updated = excluded.updated
+            """,
+            [(name, h["trips"], h["open_until"], h.get("reason"), now) for name, h in health.items()],
+        )
+    conn.close()
+
+
+# -------------------------
+# PAGE YIELD
+# Per run and listing source: the page budget, how paging ended, and the
+# candidates / relevant jobs of every page fetched. app.py sizes the next
+# run's page budget from this history.
+# -------------------------
+def init_paging_db(path=None):
+    conn = get_db(path)
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS page_runs (
+            source TEXT NOT NULL,
+            run_at TEXT NOT NULL,
+            budget INTEGER NOT NULL,
+            stop TEXT NOT NULL,
+            PRIMARY KEY (source, run_at)
+        );
+        CREATE TABLE IF NOT EXISTS page_yield (
+            source TEXT NOT NULL,
+            run_at TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            candidates INTEGER NOT NULL,
+            relevant INTEGER NOT NULL,
+            PRIMARY KEY (source, run_at, page)
+        );
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+def record_page_yield(runs, path=None):
+    """
+    Store one run's paging: {source name: {"budget", "stop", "pages": [(candidates, relevant), ...]}},
+    pages in page order.
+    """
+    init_paging_db(path)
+    now = datetime.now().isoformat(timespec="seconds")
+    conn = get_db(path)
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO page_runs (source, run_at, budget, stop) VALUES (?, ?, ?, ?)",
+            [(name, now, r["budget"], r["stop"]) for name, r in runs.items()],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO page_yield (source, run_at, page, candidates, relevant) VALUES (?, ?, ?, ?, ?)",
+            [(name, now, page, candidates, relevant)
+             for name, r in runs.items() for page, (candidates, relevant) in enumerate(r["pages"])],
+        )
+    conn.close()
+
+
+def load_page_history(runs=5, path=None):
+    """
+    The latest `runs` runs of every source, newest first:
+    {source name: [{"budget", "stop", "relevant": [per-page counts]}, ...]}.
+    """
+    init_paging_db(path)
+    conn = get_db(path)
+    rows = conn.execute(
+        """
+        SELECT r.source, r.run_at, r.budget, r.stop, y.page, y.relevant
+        FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY source ORDER BY run_at DESC) AS n FROM page_runs) r
+        LEFT JOIN page_yield y ON y.source = r.source AND y.run_at = r.run_at
+        WHERE r.n <= ?
+        ORDER BY r.source, r.run_at DESC, y.page
+        """,
+        (runs,),
+    ).fetchall()
+    conn.close()
+    history = {}
+    for row in rows:
+        source_runs = history.setdefault(row["source"], [])
+        if not source_runs or source_runs[-1]["run_at"] != row["run_at"]:
+            source_runs.append({"run_at": row["run_at"], "budget": row["budget"], "stop": row["stop"], "relevant": []})
+        if row["page"] is not None:
+            source_runs[-1]["relevant"].append(row["relevant"])
+    return history
+
+
+# -------------------------
+# JOB DETAILS
+# Facts read from detail pages (details.py), keyed by canonical link. A
+# page that was read is never fetched again; failures are retried on later
+# runs up to DETAIL_MAX_ATTEMPTS times.
+# -------------------------
+DETAIL_MAX_ATTEMPTS = 3
+DETAIL_FIELDS = ("experience_min", "experience_max", "location", "posted", "skills")
+
+
+def init_details_db(path=None):
+    conn = get_db(path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_details (
+            canonical_link TEXT PRIMARY KEY,
+            ok INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            experience_min INTEGER,
+            experience_max INTEGER,
+            location TEXT,
+            posted TEXT,
+            skills TEXT,
+            fetched TEXT NOT NULL
+        );
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+def load_details(links, path=None):
+    """
+    ({link: details} for links already read, set of links not to fetch
+    again) among `links`. details holds DETAIL_FIELDS, skills as a list.
+    """
+    init_details_db(path)
+    conn = get_db(path)
+    conn.execute("CREATE TEMP TABLE wanted (link TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", [(link,) for link in links])
+    rows = conn.execute(
+        "SELECT d.* FROM job_details d JOIN wanted w ON w.link = d.canonical_link"
+    ).fetchall()
+    conn.close()
+    details, done = {}, set()
+    for r in rows:
+        if r["ok"]:
+            details[r["canonical_link"]] = {k: r[k] for k in DETAIL_FIELDS}
+            details[r["canonical_link"]]["skills"] = [s for s in (r["skills"] or "").split(",") if s]
+            done.add(r["canonical_link"])
+        elif r["attempts"] >= DETAIL_MAX_ATTEMPTS:
+            done.add(r["canonical_link"])
+    return details, done
+
+
+def save_details(read, failed, path=None):
+    """Store {link: details} read this run and count an attempt for every link in `failed`."""
+    init_details_db(path)
+    now = datetime.now().isoformat(timespec="seconds")
+    conn = get_db(path)
+    with conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO job_details
+                (canonical_link, ok, attempts, experience_min, experience_max, location, posted, skills, fetched)
+            VALUES (?, 1, 1, ?, ?, ?, ?, ?, ?)
+            """,
+            [(link, d["experience_min"], d["experience_max"], d["location"], d["posted"], ",".join(d["skills"]), now)
+             for link, d in read.items()],
+        )
+        conn.executemany(
+            """
+            INSERT INTO job_details (canonical_link, ok, attempts, fetched) VALUES (?, 0, 1, ?)
+            ON CONFLICT(canonical_link) DO UPDATE SET attempts = attempts + 1, fetched = excluded.fetched
+            """,
+            [(link, now) for link in failed],
+        )
+    conn.close()
+
+
+# -------------------------
+# JOB HISTORY
+# Every job a run shortlisted (after dedupe and enrichment), keyed by its
+# fingerprint like seen_jobs: different jobs behind one shared careers /
+# apply link stay separate rows, and the link is an indexed column. A job keeps its
+# first_seen, which also names its month partition in Parquet exports;
+# later runs bump last_seen and times_seen and fill in detail fields they
+# learned. Indexed for lookups by link, company and source / first_seen
+# ("Infopark jobs of the last 30 days").
+# -------------------------
+JOB_FIELDS = ("job_key", "fingerprint", "canonical_link", "title", "company", "source", "sources", "location",
+              "experience_min", "experience_max", "posted", "skills", "first_seen", "last_seen", "times_seen")
+
+
+def init_jobs_db(path=None):
+    conn = get_db(path)
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_key TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            canonical_link TEXT,
+            title TEXT NOT NULL,
+            company TEXT,
+            source TEXT,
+            sources TEXT,
+            location TEXT,
+            experience_min INTEGER,
+            experience_max INTEGER,
+            posted TEXT,
+            skills TEXT,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            times_seen INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_link ON jobs (canonical_link);
+        CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_jobs_source_first_seen ON jobs (source, first_seen);
+        CREATE INDEX IF NOT EXISTS idx_jobs_first_seen ON jobs (first_seen);
+        """
+    )
+    # rows written while the key was the canonical link
+    conn.execute("UPDATE OR REPLACE jobs SET job_key = fingerprint WHERE job_key != fingerprint")
+    conn.commit()
+    conn.close()
+
+
+def _job_row(job, now):
+    keys = job_keys(job)
+    link = keys[1] if len(keys) > 1 else None
+    skills = job.get("skills") or ""
+    if isinstance(skills, list):
+        skills = ",".join(skills)
+    sources = job.get("sources") or [job.get("source") or ""]
+    return (keys[0], keys[0], link, (job.get("title") or "").strip(),
+            (job.get("company") or "").strip(), job.get("source") or "", ",".join(s for s in sources if s),
+            job.get("location") or None, job.get("experience_min"), job.get("experience_max"),
+            job.get("posted") or None, skills or None, now, now, 1)
+
+
+def upsert_jobs(jobs, path=None):
+    """
+    Insert or update `jobs` (dicts as they leave app.stream_jobs) with one
+    executemany in one transaction. Returns how many rows were written.
+    """
+    init_jobs_db(path)
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = {}
+    for job in jobs:
+        if job.get("title"):
+            row = _job_row(job, now)
+            prev = rows.get(row[0])
+            # the same job twice in one batch: one row, each field from the first copy that has it
+            rows[row[0]] = row if prev is None else tuple(p if p is not None else r for p, r in zip(prev, row))
+    conn = get_db(path)
+    with conn:
+        conn.executemany(
+            f"""
+            INSERT INTO jobs ({", ".join(JOB_FIELDS)}) VALUES ({", ".join("?" * len(JOB_FIELDS))})
+            ON CONFLICT(job_key) DO UPDATE SET
+                title = excluded.title,
+                company = excluded.company,
+                sources = excluded.sources,
+                location = COALESCE(excluded.location, jobs.location),
+                experience_min = COALESCE(excluded.experience_min, jobs.experience_min),
+                experience_max = COALESCE(excluded.experience_max, jobs.experience_max),
+                posted = COALESCE(excluded.posted, jobs.posted),
+                skills = COALESCE(excluded.skills, jobs.skills),
+                last_seen = excluded.last_seen,
+                times_seen = jobs.times_seen + 1
+            """,
+            list(rows.values()),
+        )
+    conn.close()
+    return len(rows)
+
+
+def query_jobs(source=None, company=None, days=None, since=None, limit=None, path=None):
+    """
+    Jobs in the history, newest first_seen first, optionally only from
+    `source`, at `company` (case-insensitive), and first seen in the last
+    `days` days or since the ISO timestamp `since`.
+    """
+    init_jobs_db(path)
+    where, params = [], []
+    if source:
+        where.append("source = ?")
+        params.append(source)
+    if company:
+        where.append("company = ? COLLATE NOCASE")
+        params.append(company)
+    if days is not None:
+        since = (datetime.now() - timedelta(days=days)).isoformat(timespec="seconds")
+    if since:
+        where.append("first_seen >= ?")
+        params.append(since)
+    sql = "SELECT * FROM jobs" + (f" WHERE {' AND '.join(where)}" if where else "") + " ORDER BY first_seen DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    conn = get_db(path)
+    rows = [dict(r) for r in conn.execute(sql, params)]
+    conn.close()
+    return rows
+
+
+def job_months(path=None, seen_since=None):
+    """
+    Months ("YYYY-MM") that jobs were first seen in, oldest first; only
+    those of jobs seen again since the ISO timestamp `seen_since` when given.
+    """
+    init_jobs_db(path)
+    conn = get_db(path)
+    where, params = ("WHERE last_seen >= ?", (seen_since,)) if seen_since else ("", ())
+    months = [r[0] for r in conn.execute(f"SELECT DISTINCT substr(first_seen, 1, 7) FROM jobs {where} ORDER BY 1",
+                                         params)]
+    conn.close()
+    return months
+
+
+def export_jobs_parquet(directory, months=None, path=None):
+    """
+    Write the history as one Parquet file per first-seen month,
+    directory/month=YYYY-MM/jobs.parquet (Hive-style partitions, readable
+    by pandas, DuckDB or Spark as one dataset). Only `months` are
+    rewritten when given. Needs pandas with pyarrow (or fastparquet).
+    Returns the files written.
+    """
+    import pandas as pd
+    written = []
+    conn = get_db(path)
+    try:
+        for month in months or job_months(path):
+            start = f"{month}-01"
+            year, mon = map(int, month.split("-"))
+            end = f"{year + mon // 12:04d}-{mon % 12 + 1:02d}-01"
+            df = pd.read_sql_query("SELECT * FROM jobs WHERE first_seen >= ? AND first_seen < ? ORDER BY first_seen",
+                                   conn, params=(start, end))
+            if df.empty:
+                continue
+            out_dir = os.path.join(directory, f"month={month}")
+            os.makedirs(out_dir, exist_ok=True)
+            out = os.path.join(out_dir, "jobs.parquet")
+            tmp = f"{out}.{os.getpid()}.tmp"
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, out)
+            written.append(out)
+    finally:
+        conn.close()
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Query or export the job history in SEEN_DB_PATH")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query = commands.add_parser("query", help="list jobs, newest first")
+    query.add_argument("--source")
+    query.add_argument("--company")
+    query.add_argument("--days", type=float, help="first seen within this many days")
+    query.add_argument("--limit", type=int, default=50)
+    export = commands.add_parser("export", help="write month-partitioned Parquet files")
+    export.add_argument("directory")
+    export.add_argument("--month", action="append", help="YYYY-MM to rewrite (repeatable; default all)")
+    args = parser.parse_args()
+
+    if args.command == "query":
+        started = time.perf_counter()
+        found = query_jobs(args.source, args.company, args.days, limit=args.limit)
+        elapsed = time.perf_counter() - started
+        for job in found:
+            print(f"{job['first_seen']}  {job['source']:<12.12}  {job['title'][:60]:<60}  {job['company'] or ''}")
+        print(f"{len(found)} job(s) in {elapsed * 1000:.1f} ms")
+    else:
+        for out in export_jobs_parquet(args.directory, args.month):
+            print(out)
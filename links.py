@@ -0,0 +1,91 @@
+# links.py
+# Canonical form of job links. The same job is scraped as an Indeed /rc/clk
+# redirect or a /viewjob page, as a LinkedIn URL carrying trk/refId, or as
+# a relative href joined onto different pages. canonical_link() maps all of
+# these to one URL, which app.py uses as the job's link and as the key for
+# dedupe, the seen-jobs history (job_store.py) and click tracking.
+import functools
+import re
+import urllib.parse
+
+# Query parameters that only track the click, never select the job, on any host.
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "dclid", "yclid", "_ga", "_gl", "mc_cid", "mc_eid", "igshid"}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "mtm_")
+# Generic names that the portals in LINK_RULES use for tracking, but that a
+# small career site may use to select the job, so they are only dropped there.
+PORTAL_TRACKING_PARAMS = {
+    "trk", "trkinfo", "refid", "trackingid", "lipi", "midtoken", "midsig", "eid", "otptoken",
+    "ref", "referrer", "src", "from", "spm", "campaign", "pagenum",
+    "tk", "vjs", "advn", "adid", "sjdu", "acatk", "pub", "xpse", "xfps", "xkcb", "fccid", "from_page",
+}
+
+def _indeed(path, query):
+    # /rc/clk, /pagead/clk, /viewjob and /company/.../jobs/...?jk= all name the job by its key
+    jk = query.get("jk") or query.get("vjk")
+    return ("/viewjob", [("jk", jk)]) if jk else None
+
+_LINKEDIN_JOB = re.compile(r"/jobs/view/(?:[^/]*-)?(\d+)")
+
+def _linkedin(path, query):
+    m = _LINKEDIN_JOB.search(path)
+    if m:
+        return f"/jobs/view/{m.group(1)}", []
+    job_id = query.get("currentJobId")
+    return (f"/jobs/view/{job_id}", []) if job_id else None
+
+def _naukri(path, query):
+    # job-listings-<slug>-<id> pages; every query parameter is tracking
+    return (path, []) if path.startswith("/job-listings-") else None
+
+# host suffix -> (canonical host or None to keep, rule(path, query) -> (path, query pairs) or None)
+LINK_RULES = {
+    "indeed.co.in": ("www.indeed.co.in", _indeed),
+    "indeed.com": (None, _indeed),
+    "linkedin.com": ("www.linkedin.com", _linkedin),
+    "naukri.com": ("www.naukri.com", _naukri),
+}
+
+def _host_rule(host):
+    for suffix, rule in LINK_RULES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return rule
+    return None, None
+
+def _is_tracking(name, portal=False):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES) or (portal and name in PORTAL_TRACKING_PARAMS)
+
+@functools.lru_cache(maxsize=65536)
+def canonical_link(url, base=None):
+    """
+    Canonical form of `url` (joined onto `base` if relative): lowercased
+    scheme and host, no default port, session path parameters, tracking
+    query parameters (PORTAL_TRACKING_PARAMS only on LINK_RULES hosts),
+    trailing slash or fragment (hash routes like "#/job/1" are kept),
+    remaining parameters sorted, then the host's LINK_RULES.
+    Non-HTTP links (mailto:, javascript:) are returned stripped but unchanged.
+    """
+    url = (url or "").strip()
+    if base and url:
+        url = urllib.parse.urljoin(base, url)
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return url
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r";jsessionid=[^/?#]*", "", parts.path, flags=re.IGNORECASE)
+    path = re.sub(r"/{2,}", "/", path).rstrip("/") or "/"
+    canonical_host, rule = _host_rule(host)
+    pairs = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+             if not _is_tracking(k, portal=rule is not None)]
+    fragment = parts.fragment if parts.fragment.startswith(("/", "!")) else ""
+
+    if rule:
+        rewritten = rule(path, dict(urllib.parse.parse_qsl(parts.query)))
+        if rewritten:
+            path, pairs = rewritten
+            host = canonical_host or host
+            fragment = ""
+    return urllib.parse.urlunsplit((scheme, host, path, urllib.parse.urlencode(sorted(pairs)), fragment))
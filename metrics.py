@@ -0,0 +1,219 @@
+# metrics.py
+# Per-stage instrumentation of a scraper run. app.py wraps every stage
+# (fetch, parse, filter, record, dedupe, enrich, render, send) in
+# RunMetrics.stage() and counts what went through it: pages, bytes,
+# candidates, accepted / rejected jobs, errors. At the end of a run the
+# numbers are written as a JSON run report and, if SCRAPER_PROM_TEXTFILE
+# is set, as a Prometheus textfile for node_exporter's textfile collector.
+# Together they give every run a baseline that later runs can be compared
+# against.
+#
+# Stages nest (a browser fetch parses the page it loaded). "seconds"
+# includes nested stages and "self_seconds" does not, so the self times
+# add up to the time spent working. Stages running on several threads add
+# up their time, so a stage can take longer than the run's wall clock.
+# Stages named in SCRAPER_PROFILE (comma-separated, or "all") are run
+# under cProfile and dumped to SCRAPER_PROFILE_DIR/<stage>.prof, which can
+# be read with `python -m pstats`.
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+RUN_REPORT = os.getenv("SCRAPER_RUN_REPORT", "run_report.json")  # "" disables the JSON report
+PROM_TEXTFILE = os.getenv("SCRAPER_PROM_TEXTFILE", "")           # e.g. /var/lib/node_exporter/scraper.prom
+PROFILE_STAGES = {s.strip() for s in os.getenv("SCRAPER_PROFILE", "").split(",") if s.strip()}
+PROFILE_DIR = os.getenv("SCRAPER_PROFILE_DIR", "profiles")
+PROM_PREFIX = "jobscraper"
+
+
+class _Frame:
+    __slots__ = ("name", "profiler", "counts", "child")
+
+    def __init__(self, name, profiler):
+        self.name = name
+        self.profiler = profiler
+        self.counts = Counter()
+        self.child = 0.0  # seconds spent in stages nested inside this one
+
+
+class RunMetrics:
+    """Timings and counts of one run, by stage; safe to use from any thread."""
+
+    def __init__(self, profile=None):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.profile = PROFILE_STAGES if profile is None else set(profile)
+        self.stages = {}   # name -> {"seconds", "self_seconds", "calls", "counts"}
+        self.run = {}      # run-level totals set by the caller (candidates, unique jobs, ...)
+        self._profilers = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _profiler(self, name):
+        if name not in self.profile and "all" not in self.profile:
+            return None
+        key = (name, threading.get_ident())
+        with self._lock:
+            if key not in self._profilers:
+                self._profilers[key] = cProfile.Profile()
+            return self._profilers[key]
+
+    @contextlib.contextmanager
+    def stage(self, name, **counts):
+        """
+        Time the block as stage `name`. Yields a Counter that the block can
+        add to (counts["rows"] += n), and an exception leaving the block
+        counts as an error. Don't use it across an await: the stack of open
+        stages is kept per thread. Time coroutines with observe() instead.
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        if parent and parent.profiler:
+            parent.profiler.disable()
+        frame = _Frame(name, self._profiler(name))
+        frame.counts.update(counts)
+        stack.append(frame)
+        if frame.profiler:
+            frame.profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield frame.counts
+        except Exception:
+            frame.counts["errors"] += 1
+            raise
+        finally:
+            if frame.profiler:
+                frame.profiler.disable()
+            stack.pop()
+            elapsed = time.perf_counter() - started
+            if parent:
+                parent.child += elapsed
+                if parent.profiler:
+                    parent.profiler.enable()
+            self.observe(name, elapsed, elapsed - frame.child, **frame.counts)
+
+    def observe(self, name, seconds, self_seconds=None, **counts):
+        """Add one timed call of stage `name` (and its counts)."""
+        with self._lock:
+            st = self.stages.setdefault(name, {"seconds": 0.0, "self_seconds": 0.0, "calls": 0,
+                                               "counts": Counter()})
+            st["seconds"] += seconds
+            st["self_seconds"] += seconds if self_seconds is None else self_seconds
+            st["calls"] += 1
+            st["counts"].update(counts)
+
+    def count(self, name, **counts):
+        """Add counts to stage `name` without timing anything."""
+        with self._lock:
+            st = self.stages.setdefault(name, {"seconds": 0.0, "self_seconds": 0.0, "calls": 0,
+                                               "counts": Counter()})
+            st["counts"].update(counts)
+
+    # ---- output ----
+    def report(self):
+        """The run report as a JSON-ready dict."""
+        with self._lock:
+            stages = {name: {"seconds": round(st["seconds"], 4), "self_seconds": round(st["self_seconds"], 4),
+                             "calls": st["calls"], **dict(sorted(st["counts"].items()))}
+                      for name, st in self.stages.items()}
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "stages": stages,
+            "run": self.run,
+        }
+
+    def prometheus(self, report=None):
+        """The report in the Prometheus text exposition format."""
+        report = report or self.report()
+        lines = []
+
+        def family(name, help_text, samples):
+            lines.append(f"# HELP {PROM_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROM_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                value = int(value) if float(value).is_integer() else float(value)
+                lines.append(f"{PROM_PREFIX}_{name}{{{label_text}}} {value!r}" if label_text
+                             else f"{PROM_PREFIX}_{name} {value!r}")
+
+        stages = report["stages"]
+        family("run_timestamp_seconds", "Start of the last run (unix time).", [({}, self.started_at)])
+        family("run_seconds", "Wall-clock duration of the last run.", [({}, report["wall_seconds"])])
+        family("stage_seconds", "Seconds spent in a stage, nested stages included, summed over threads.",
+               [({"stage": s}, st["seconds"]) for s, st in stages.items()])
+        family("stage_self_seconds", "Seconds spent in a stage itself, summed over threads.",
+               [({"stage": s}, st["self_seconds"]) for s, st in stages.items()])
+        family("stage_calls", "Times a stage ran.", [({"stage": s}, st["calls"]) for s, st in stages.items()])
+        family("stage_items", "Items counted by a stage (pages, bytes, candidates, errors, ...).",
+               [({"stage": s, "item": k}, v) for s, st in stages.items() for k, v in st.items()
+                if k not in ("seconds", "self_seconds", "calls") and isinstance(v, (int, float))])
+        family("run_items", "Run totals (candidates, relevant, unique and new jobs, ...).",
+               [({"item": k}, v) for k, v in report["run"].items() if isinstance(v, (int, float))])
+        return "\n".join(lines) + "\n"
+
+    def _write(self, path, text):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"  # the textfile collector must never see half a file
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def dump_profiles(self, directory=None):
+        """Write one merged .prof per profiled stage; returns the paths written."""
+        directory = directory or PROFILE_DIR
+        by_stage = {}
+        with self._lock:
+            for (name, _), profiler in self._profilers.items():
+                by_stage.setdefault(name, []).append(profiler)
+        paths = []
+        for name, profilers in sorted(by_stage.items()):
+            stats = None
+            for profiler in profilers:
+                try:
+                    if stats is None:
+                        stats = pstats.Stats(profiler)
+                    else:
+                        stats.add(profiler)
+                except TypeError:  # this thread's profiler recorded no calls
+                    pass
+            if stats is None:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{name}.prof")
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def write(self, report_path=None, prom_path=None):
+        """Write the JSON report, the Prometheus textfile and the profiles that are enabled; returns the paths."""
+        report_path = RUN_REPORT if report_path is None else report_path
+        prom_path = PROM_TEXTFILE if prom_path is None else prom_path
+        report = self.report()
+        paths = self.dump_profiles()
+        report["profiles"] = paths
+        if report_path:
+            self._write(report_path, json.dumps(report, indent=1, default=str))
+            paths.append(report_path)
+        if prom_path:
+            self._write(prom_path, self.prometheus(report))
+            paths.append(prom_path)
+        return paths
+
+    def print_summary(self):
+        """One line per stage, slowest (self time) first."""
+        report = self.report()
+        for name, st in sorted(report["stages"].items(), key=lambda kv: -kv[1]["self_seconds"]):
+            counts = ", ".join(f"{k} {v:,}" for k, v in st.items()
+                               if k not in ("seconds", "self_seconds", "calls"))
+            print(f"   📊 {name}: {st['self_seconds']:.2f}s self / {st['seconds']:.2f}s total over "
+                  f"{st['calls']} call(s){f' ({counts})' if counts else ''}")
@@ -0,0 +1,261 @@
+"""
+Source registry for app.py.
+
+Every job source is one entry in SOURCES: where its pages live, how they
+are paginated, which selectors hold the jobs, which company to fall back
+to, whether it can be fetched over plain HTTP or needs Chrome, and its
+wait / cache / time / failure budgets. app.run_source() (threads) and
+app.crawl_source() (async mode) execute any entry, so adding a park is a
+config change.
+
+Parsers here only look at an already-fetched BeautifulSoup document
+(built from just the source's `strain` tags when it declares them); all
+network and browser work stays in app.py.
+"""
+import hashlib
+import urllib.parse
+
+# -------------------------
+# PARSERS
+# Every parser is called as parse(soup, url, source) and returns a list of
+# raw candidates ({"title", "company", "link"[, "snippet"]}).
+# -------------------------
+def absolute(url, href):
+    if href and not href.startswith("http"):
+        return urllib.parse.urljoin(url, href)
+    return href or ""
+
+def anchor_href(el):
+    """href of an anchor, or of the first link inside a card element."""
+    if el.has_attr("href"):
+        return el["href"]
+    a = el.find("a", href=True)
+    return a["href"] if a else ""
+
+def parse_anchors(soup, url, source):
+    """One job per non-empty element matching source["anchors"]."""
+    jobs = []
+    anchors = soup.select(source["anchors"])
+    if not anchors and source["anchor_fallback"]:
+        anchors = soup.find_all("a", href=True)
+    for a in anchors:
+        t = a.get_text(strip=True)
+        if not t:
+            continue
+        jobs.append({"title": t, "company": source["company"], "link": absolute(url, anchor_href(a))})
+    return jobs
+
+def parse_table(soup, url, source):
+    """
+    Job tables (header row, then title / company cells at
+    source["columns"]). Pages without a table fall back to parse_anchors().
+    """
+    rows = soup.select("table tr")
+    if len(rows) < 2:
+        return parse_anchors(soup, url, source)
+    title_col, company_col = source["columns"]
+    jobs = []
+    for row in rows[1:]:
+        cols = row.find_all("td")
+        if len(cols) <= max(title_col, company_col):
+            continue
+        company = cols[company_col].get_text(strip=True)
+        a = row.find("a", href=True)
+        jobs.append({"title": cols[title_col].get_text(strip=True),
+                     "company": company or source["company"],
+                     "link": absolute(url, a["href"] if a else "")})
+    return jobs
+
+def parse_indeed_cards(soup, url, source):
+    jobs = []
+    cards = soup.select(source["rows"]) or soup.select(source["anchors"])
+    for c in cards:
+        # try multiple ways to obtain title/company/link
+        title_el = c.select_one("h2.jobTitle, .jobTitle, .title")
+        title = title_el.get_text(strip=True) if title_el else c.get_text(strip=True)[:120]
+        comp_el = c.select_one(".companyName, .company")
+        company = comp_el.get_text(strip=True) if comp_el else ""
+        if c.has_attr("data-jk"):
+            link = f"https://www.indeed.co.in/viewjob?jk={c['data-jk']}"
+        else:
+            link = absolute(url, c.get("href", ""))
+        jobs.append({"title": title, "company": company or source["company"], "link": link, "snippet": company})
+    return jobs
+
+def parse_naukri_cards(soup, url, source):
+    jobs = []
+    cards = soup.select(source["rows"]) or soup.select(source["anchors"])
+    for c in cards:
+        # company is usually in .company or .orgName
+        comp_el = c.select_one(".company, .orgName, .companyName")
+        company = comp_el.get_text(strip=True) if comp_el else ""
+        link = c["href"] if c.name == "a" and c.has_attr("href") else ""
+        jobs.append({"title": c.get_text(strip=True)[:140], "company": company or source["company"],
+                     "link": absolute(url, link), "snippet": company})
+    return jobs
+
+def parse_linkedin_cards(soup, url, source):
+    jobs = []
+    for c in soup.select(source["rows"]):
+        title_el = c.select_one("h3, .base-search-card__title")
+        comp_el = c.select_one("h4, .base-search-card__subtitle")
+        title = title_el.get_text(strip=True) if title_el else c.get_text(strip=True)[:120]
+        company = comp_el.get_text(strip=True) if comp_el else ""
+        jobs.append({"title": title, "company": company or source["company"],
+                     "link": absolute(url, anchor_href(c)), "snippet": company})
+    return jobs
+
+def find_career_links(soup, url, source):
+    """Links on a hub page that look like career/job pages."""
+    career_links = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        text = a.get_text(strip=True)
+        if not text:
+            continue
+        if "career" in href.lower() or "job" in href.lower() or "career" in text.lower() or "vacancy" in text.lower():
+            career_links.append(absolute(url, href))
+    return career_links
+
+def parse_hub_page(soup, url, source):
+    """
+    One page of a hub crawl: every link is a job candidate, and career-ish
+    links are returned separately for the crawler to follow.
+    """
+    return {"jobs": parse_anchors(soup, url, {**source, "anchors": "a[href]"}),
+            "links": find_career_links(soup, url, source)}
+
+# -------------------------
+# REGISTRY
+# -------------------------
+DEFAULT_QUERY_TERMS = ["python", "data analyst", "data scientist", "machine learning", "react"]
+
+SOURCE_DEFAULTS = {
+    "kind": "listing",        # "listing": url pages hold jobs; "hub": crawled from url for career pages
+    "pages": 1,               # first page budget when url contains {page}; later runs adapt it (app.page_budget)
+    "page_start": 1,          # value of {page} on the first page
+    "page_step": 1,           # increment of {page} per page (e.g. 10 for offset-based search)
+    "query_terms": None,      # joined with query_join into {query} (one search per term with fan_out)
+    "query_join": "+",
+    "fan_out": False,         # search each query term (and location) on its own instead of one joined {query}
+    "locations": None,        # values of {location}; only the first unless fan_out
+    "query_concurrency": 2,   # fan_out: searches of this source running at once
+    "rows": "a[href]",        # selector that proves a page holds listings; Chrome waits for it
+    "anchors": "a[href]",     # job elements for parse_anchors() / fallback cards for portals
+    "anchor_fallback": True,  # parse_anchors(): use every link when `anchors` matches nothing
+    "columns": (1, 2),        # parse_table(): title and company cell index
+    "strain": None,           # only build these tags (SoupStrainer); None builds the whole page
+    "parse": parse_anchors,
+    "company": "",            # company used when a row doesn't name one
+    "trust": 1.0,             # 0..1, how far its listings are taken at face value when ranking (app.rank_jobs)
+    "tier": "http",           # "http": plain HTTP, Chrome only when a 200 page lacks `rows`; "browser": always Chrome
+    "wait_limit": None,       # max seconds for readiness/scroll waits (None: app.PAGE_WAIT_LIMIT)
+    "cache_ttl": None,        # seconds a cached page is used unrevalidated (None: SCRAPER_CACHE_TTL)
+    "scrolls": 0,             # infinite-scroll steps after load (browser only)
+    "sequential": False,      # fetch pages one at a time and stop at the first empty one
+    "max_depth": 2,           # hub: link hops followed from url (its career pages are depth 1)
+    "max_pages": 15,          # hub: pages fetched per crawl, the seed page included; listing: page budget cap
+    "time_budget": 180.0,     # wall-clock seconds from the first page; then the circuit opens (None: no limit)
+    "max_failures": 3,        # failed pages that open the circuit (captcha/login walls open it at once)
+    "enabled": True,
+}
+
+def source(**fields):
+    unknown = set(fields) - set(SOURCE_DEFAULTS) - {"name", "url"}
+    if unknown:
+        raise ValueError(f"unknown source field(s) {sorted(unknown)} in {fields.get('name')!r}")
+    return {**SOURCE_DEFAULTS, **fields}
+
+# Bangalore—known resource pages (Manyata/ITPB/Ecospace may not host centralized job lists)
+BENGALURU_URLS = [
+    # Replace/extend with actual hub pages you want to target
+    "https://manyata.com",      # placeholder/fallback
+    "https://itpbengaluru.org", # placeholder
+    "https://www.embassymanyata.com"  # placeholder
+]
+
+# Order is priority: a job listed by several sources keeps the fields of the
+# earliest one, and ties in ranking and the rows of jobs.csv follow this
+# order (app.job_order).
+SOURCES = [
+    # Kerala parks
+    source(name="Infopark", url="https://infopark.in/companies/job-search?page={page}", pages=6,
+           parse=parse_table, rows="table tr td", strain=("table", "a"), company="Infopark", cache_ttl=3600),
+    source(name="Technopark", url="https://technopark.in/job-search?page={page}", pages=6,
+           parse=parse_table, rows="table tr td", strain=("table", "a"), company="Technopark", cache_ttl=3600),
+    source(name="Cyberpark", url="https://cyberparks.in/careers", company="Cyberpark",
+           anchors="a[href*='job'], a[href*='career'], .job, .career, .vacancy, .job-card"),
+    source(name="SmartCity Kochi", url="https://smartcitykochi.in/careers", company="SmartCity Kochi",
+           anchors="a[href*='job'], a[href*='career'], .vacancy, .career-item, .job-card"),
+    # Major hubs
+    source(name="TIDEL Park", url="https://www.tidelpark.com/careers", company="TIDEL Park Chennai",
+           rows="a[href*='career'], a[href*='job'], .career, .vacancy",
+           anchors="a[href*='career'], a[href*='job'], .career, .vacancy", anchor_fallback=False),
+    source(name="STPI", url="https://www.stpi.in/career", company="STPI India",
+           rows="a[href*='career'], a[href*='job'], .vacancy, .career",
+           anchors="a[href*='career'], a[href*='job'], .vacancy, .career", anchor_fallback=False),
+] + [
+    source(name=f"Bangalore generic {u}", url=u, kind="hub", strain=("a",), company=urllib.parse.urlsplit(u).netloc,
+           trust=0.5)
+    for u in BENGALURU_URLS
+] + [
+    # Big job portals (search-based, rendered by JavaScript)
+    source(name="Indeed", url="https://www.indeed.co.in/jobs?q={query}&l={location}&start={page}",
+           pages=4, page_start=0, page_step=10, query_terms=DEFAULT_QUERY_TERMS, fan_out=True, locations=["India"],
+           parse=parse_indeed_cards, rows="a[data-jk], .job_seen_beacon, .result",
+           anchors="a[href*='/rc/clk']", company="Indeed", tier="browser", wait_limit=12.0, scrolls=5, trust=0.8),
+    source(name="Naukri", url="https://www.naukri.com/{query}-jobs-{page}",
+           pages=3, query_terms=DEFAULT_QUERY_TERMS, query_join="%20", fan_out=True,
+           parse=parse_naukri_cards, rows=".jobTuple, .jobTuple .title, .jobCard, .list",
+           company="Naukri", tier="browser", wait_limit=12.0, scrolls=4, trust=0.8),
+    # LinkedIn best-effort — blocks scraping aggressively and may require login,
+    # so it runs one joined search (never fanned out), a blocked (empty) page
+    # ends it and a single failure opens its circuit.
+    source(name="LinkedIn", url="https://www.linkedin.com/jobs/search?keywords={query}&location={location}&start={page}",
+           pages=1, page_start=0, page_step=25, query_terms=DEFAULT_QUERY_TERMS, query_join="%20",
+           locations=["India"], query_concurrency=1,
+           parse=parse_linkedin_cards,
+           rows=".result-card__contents, .jobs-search-results__list-item, .base-search-card__info",
+           company="LinkedIn", tier="browser", wait_limit=8.0, scrolls=6, sequential=True,
+           time_budget=90.0, max_failures=1, trust=0.6),
+]
+
+def source_queries(source, fan_out=True):
+    """
+    Searches of a listing source as {"terms", "location", "label"}: one
+    search over all query_terms at the first location, or with the
+    source's fan_out (and `fan_out`) one per term and location. label names
+    a fanned-out search ("python", "python @ Kochi") and is "" otherwise.
+    """
+    terms = source["query_terms"] or []
+    locations = source["locations"] or [None]
+    if not (fan_out and source["fan_out"]) or len(terms) * len(locations) < 2:
+        return [{"terms": terms, "location": locations[0], "label": ""}]
+    return [{"terms": [term], "location": location,
+             "label": term if len(locations) == 1 else f"{term} @ {location}"}
+            for term in terms for location in locations]
+
+def source_urls(source, pages=None, terms=None, location=None):
+    """
+    Page URLs of a listing source, in page order: `pages` of them (default
+    source["pages"]) of the search for `terms` at `location` (default: all
+    query_terms, first location).
+    """
+    terms = source["query_terms"] if terms is None else terms
+    location = location or (source["locations"] or [""])[0]
+    fields = {"query": source["query_join"].join(urllib.parse.quote_plus(q) for q in terms or []),
+              "location": urllib.parse.quote_plus(location)}
+    if "{page}" not in source["url"]:
+        return [source["url"].format(**fields)]
+    return [source["url"].format(page=source["page_start"] + i * source["page_step"], **fields)
+            for i in range(pages or source["pages"])]
+
+def parse_key(source, step="rows"):
+    """
+    Key for rows cached by content hash. Includes the fields that shape
+    parsing, so editing a source's selectors invalidates its cached rows.
+    """
+    shape = repr([source[k] for k in ("anchors", "anchor_fallback", "columns", "rows", "strain", "company")])
+    parser = source["parse"].__name__ if source["kind"] == "listing" else source["kind"]
+    digest = hashlib.sha1(f"{parser}|{shape}".encode()).hexdigest()[:8]
+    return f"{source['name']}:{step}:{digest}"
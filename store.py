@@ -2,7 +2,7 @@ import os
 import smtplib
 import time
 import urllib.parse
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -32,7 +32,7 @@ def fetch_infopark_jobs():
     for page in range(1, 3):
         url = f"https://infopark.in/companies/job-search?page={page}"
         driver.get(url)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        soup = BeautifulSoup(driver.page_source, "lxml", parse_only=SoupStrainer("table"))
         rows = soup.select("table tr")[1:]
         for row in rows:
             cols = row.find_all("td")
@@ -48,6 +48,7 @@ def fetch_infopark_jobs():
                 continue
             if any(role in title.lower() for role in TECHNICAL_ROLES):
                 jobs.append({"title": title, "company": company, "link": job_link})
+        soup.decompose()
     return jobs
 
 
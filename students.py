@@ -0,0 +1,182 @@
+# students.py
+# Student profiles and per-student job lists. The students table (users.db,
+# written by appCred.py's credential form) holds each student's name and
+# email, and optionally the skills and locations they want, as
+# comma-separated text. users.db stays on the Flask host, so appCred.py
+# serves the profiles as JSON at /student-profiles; the scheduled workflow
+# downloads them to STUDENT_PROFILES_FILE, which the run reads instead.
+# A run builds one JobIndex over its ranked jobs, an inverted index from every title / company / skill word and word n-gram to
+# the jobs containing it, plus one from location words. A student's list is
+# the union of the postings of their skills, intersected with the jobs in
+# their locations (or of no known location). Matching a roster then costs
+# the postings each student touches, not every job for every student.
+import json
+import os
+import re
+import sqlite3
+
+STUDENTS_DB_PATH = os.getenv("STUDENTS_DB_PATH", "users.db")
+PROFILES_FILE = os.getenv("STUDENT_PROFILES_FILE", "")  # JSON from profiles_json(); preferred over users.db
+MAX_TERM_WORDS = 3  # longest word n-gram indexed; longer terms intersect their n-grams
+_WORD = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")  # keeps "node.js", "c++", "c#" whole
+
+
+def get_db(path=None):
+    conn = sqlite3.connect(path or STUDENTS_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_students_db(path=None):
+    conn = get_db(path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            email TEXT UNIQUE,
+            skills TEXT,
+            locations TEXT
+        )
+        """
+    )
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(students)")}
+    for column in ("skills", "locations"):  # tables created before profiles
+        if column not in columns:
+            conn.execute(f"ALTER TABLE students ADD COLUMN {column} TEXT")
+    conn.commit()
+    conn.close()
+
+
+def split_terms(text):
+    """Comma / semicolon separated text (or a list) as lowercased terms, in order, without repeats."""
+    if isinstance(text, (list, tuple)):
+        text = ",".join(text)
+    terms = (" ".join(t.lower().split()) for t in re.split(r"[,;\n]", text or ""))
+    return list(dict.fromkeys(t for t in terms if t))
+
+
+def save_student(name, email, skills=None, locations=None, path=None):
+    """
+    Add a student, or update the name of a known email. Skills and
+    locations (comma-separated text or lists) are only replaced when given.
+    """
+    init_students_db(path)
+    skills = ", ".join(split_terms(skills)) if skills is not None else None
+    locations = ", ".join(split_terms(locations)) if locations is not None else None
+    conn = get_db(path)
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO students (name, email, skills, locations) VALUES (?, ?, ?, ?)
+            ON CONFLICT(email) DO UPDATE SET
+                name = excluded.name,
+                skills = COALESCE(excluded.skills, students.skills),
+                locations = COALESCE(excluded.locations, students.locations)
+            """,
+            (name, email, skills, locations),
+        )
+    conn.close()
+
+
+def profiles_json(path=None):
+    """Every profile in users.db as the JSON of STUDENT_PROFILES_FILE."""
+    return json.dumps(_db_profiles(path), sort_keys=True, separators=(",", ":"))
+
+
+def load_profiles(path=None):
+    """
+    {email (lowercased): {"name", "skills", "locations"}} of students with a
+    skill or location set, from STUDENT_PROFILES_FILE when it exists (and
+    no `path` is given), else from users.db.
+    """
+    if PROFILES_FILE and path is None and os.path.exists(PROFILES_FILE):
+        try:
+            with open(PROFILES_FILE, encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError:
+            print(f"⚠️ {PROFILES_FILE} is not valid JSON; mailing every student the common list")
+            return {}
+        return {email.strip().lower(): {"name": p.get("name"), "skills": split_terms(p.get("skills")),
+                                        "locations": split_terms(p.get("locations"))}
+                for email, p in data.items() if email and (p.get("skills") or p.get("locations"))}
+    return _db_profiles(path)
+
+
+def _db_profiles(path=None):
+    if not os.path.exists(path or STUDENTS_DB_PATH):
+        return {}
+    init_students_db(path)
+    conn = get_db(path)
+    rows = conn.execute("SELECT name, email, skills, locations FROM students "
+                        "WHERE COALESCE(skills, '') != '' OR COALESCE(locations, '') != ''").fetchall()
+    conn.close()
+    return {r["email"].strip().lower(): {"name": r["name"], "skills": split_terms(r["skills"]),
+                                         "locations": split_terms(r["locations"])}
+            for r in rows if r["email"]}
+
+
+def words(text):
+    return _WORD.findall((text or "").lower())
+
+
+def ngrams(tokens, n=MAX_TERM_WORDS):
+    """Every run of 1..n consecutive tokens, as space-joined strings."""
+    return {" ".join(tokens[i:i + k]) for k in range(1, n + 1) for i in range(len(tokens) - k + 1)}
+
+
+class JobIndex:
+    """
+    Inverted indexes over `jobs` (in rank order): skill term -> job
+    positions, location term -> job positions. Built once per run;
+    jobs_for() answers each student from the postings alone.
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.terms = {}      # title / company / skill n-gram -> set of job positions
+        self.places = {}     # location n-gram -> set of job positions
+        self.unplaced = set()  # jobs with no known location pass every location filter
+        for pos, job in enumerate(jobs):
+            skills = job.get("skills") or []
+            if isinstance(skills, str):
+                skills = split_terms(skills)
+            fields = [job.get("title"), job.get("company"), *skills]
+            for term in set().union(*(ngrams(words(f)) for f in fields)):
+                self.terms.setdefault(term, set()).add(pos)
+            place = words(job.get("location"))
+            if not place:
+                self.unplaced.add(pos)
+            for term in ngrams(place):
+                self.places.setdefault(term, set()).add(pos)
+
+    @staticmethod
+    def _lookup(index, term):
+        """Positions of the jobs holding `term`; a term longer than MAX_TERM_WORDS intersects its n-grams."""
+        tokens = words(term)
+        if len(tokens) <= MAX_TERM_WORDS:
+            return index.get(" ".join(tokens), set())
+        postings = sorted((index.get(" ".join(tokens[i:i + MAX_TERM_WORDS]), set())
+                           for i in range(len(tokens) - MAX_TERM_WORDS + 1)), key=len)
+        return set.intersection(*postings)
+
+    def _union(self, index, terms):
+        found = set()
+        for term in terms:
+            found |= self._lookup(index, term)
+        return found
+
+    def jobs_for(self, profile, limit=None):
+        """
+        The jobs matching a profile ({"skills", "locations"}), best first, at
+        most `limit`. A profile without skills matches every job by skill and
+        one without locations every job by location.
+        """
+        matched = None
+        if profile.get("skills"):
+            matched = self._union(self.terms, profile["skills"])
+        if profile.get("locations"):
+            placed = self._union(self.places, profile["locations"]) | self.unplaced
+            matched = placed if matched is None else matched & placed
+        positions = range(len(self.jobs)) if matched is None else sorted(matched)
+        return [self.jobs[pos] for pos in positions[:limit or None]]